@@ -190,6 +190,10 @@ def issue_mdi(command, reset=True):
             can be separated with a ``;`` and will be issued sequentially.
         reset (bool, optional): Whether to reset the Task Mode to the state
             the machine was in prior to issuing the MDI command.
+
+    Returns:
+        bool : True if the commands were issued, False if the task mode
+            could not be switched to MDI.
     """
     if reset:
         # save the previous mode
@@ -199,15 +203,17 @@ def issue_mdi(command, reset=True):
         # some commands might take less than `cycle_time` (50ms) to complete,
         # so status would not even notice that the interp_state had changed and the
         # reset mode method would not be called.
-        STATUS.old['interp_state'] = -1
+        STATUS.forceUpdate('interp_state')
 
     if setTaskMode(linuxcnc.MODE_MDI):
         # issue multiple MDI commands separated by ';'
         for cmd in command.strip().split(';'):
             LOG.info("Issuing MDI command: %s", cmd)
             CMD.mdi(cmd)
+        return True
     else:
         LOG.error("Failed to issue MDI command: {}".format(command))
+        return False
 
 def _issue_mdi_ok(mdi_cmd='', widget=None):
     if STAT.task_state == linuxcnc.STATE_ON \
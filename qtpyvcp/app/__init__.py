@@ -37,6 +37,10 @@ Application Options:
   --qt-api (pyqt5 | pyqt | pyside2 | pyside)
                        Specify the Qt Python binding to use.
   --perfmon            Monitor and log system performance.
+  --profile-startup PATH
+                       Write a JSON report of the time spent loading
+                       plugins, windows and widgets to PATH, relative to
+                       $CONFIG_DIR, and a Chrome trace next to it.
   --develop            Development mode. Enables live reloading of QSS styles.
   --command_line_args <args>...
                        Additional args passed to the QtApplication.
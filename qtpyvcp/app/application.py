@@ -15,9 +15,10 @@ from qtpy.QtWidgets import QApplication, QStyleFactory
 
 import qtpyvcp
 
+from qtpyvcp.utilities import profiler
 from qtpyvcp.utilities.logger import initBaseLogger
 from qtpyvcp.plugins import initialisePlugins, terminatePlugins, getPlugin
-from qtpyvcp.widgets.base_widgets.base_widget import VCPPrimitiveWidget
+from qtpyvcp.widgets.base_widgets.base_widget import VCPPrimitiveWidget, getRuleStats
 from qtpyvcp.widgets.form_widgets.main_window import VCPMainWindow
 
 # initialize logging. If a base logger was already initialized in a startup
@@ -236,10 +237,17 @@ class VCPApplication(QApplication):
             total_time = sum(self.perf.cpu_times())
             usage = ["{:.3f}".format(total_percent * ((t.system_time + t.user_time) / total_time)) for t in self.perf.threads()]
 
+        rule_stats = getRuleStats()
+
         LOG.info("Performance:\n"
                  "    Total CPU usage (%): {}\n"
                  "    Per Thread: {}\n"
-                 .format(total_percent, ' '.join(usage)))
+                 "    Rule evaluations: {}, setter calls saved: {}, "
+                 "QSS re-polishes saved: {}\n"
+                 .format(total_percent, ' '.join(usage),
+                         rule_stats['evaluations'],
+                         rule_stats['setter_calls_saved'],
+                         rule_stats['repolishes_saved']))
 
     def terminate(self):
         self.terminateWidgets()
@@ -248,7 +256,10 @@ class VCPApplication(QApplication):
     def initialiseWidgets(self):
         for w in self.allWidgets():
             if isinstance(w, VCPPrimitiveWidget):
-                w.initialize()
+                with profiler.span(w.objectName() or w.__class__.__name__,
+                                   'widget.initialize',
+                                   cls=w.__class__.__name__):
+                    w.initialize()
 
     def terminateWidgets(self):
         LOG.debug("Terminating widgets")
@@ -1,14 +1,14 @@
 import os
 import sys
-import time
 import importlib
 from pkg_resources import iter_entry_points
 
-from qtpy.QtCore import Qt
+from qtpy.QtCore import Qt, QTimer
 from qtpy.QtWidgets import QApplication
 
 import qtpyvcp
 from qtpyvcp import hal
+from qtpyvcp.utilities import profiler
 from qtpyvcp.utilities.logger import getLogger
 from qtpyvcp.plugins import registerPluginFromClass, postGuiInitialisePlugins
 from qtpyvcp.widgets.dialogs.error_dialog import ErrorDialog, IGNORE_LIST
@@ -47,13 +47,7 @@ def excepthook(exc_type, exc_msg, exc_tb):
 
 sys.excepthook = excepthook
 
-def log_time(task, times=[time.time(), time.time()]):
-    now = time.time()
-    LOG.debug("yellow<Time:> {:.3f} (green<{:+.3f}>) - {}"
-              .format(now - times[0], now - times[1], task))
-    times[1] = now
-
-log_time("in script")
+profiler.checkpoint("in script")
 
 
 def launch_application(opts, config):
@@ -63,24 +57,29 @@ def launch_application(opts, config):
     hal_comp = hal.component('qtpyvcp')
 
     LOG.debug('Loading data plugings')
-    loadPlugins(config['data_plugins'])
-    log_time('done loading data plugins')
+    with profiler.span('load data plugins', 'startup'):
+        loadPlugins(config['data_plugins'])
+    profiler.checkpoint('done loading data plugins')
 
     LOG.debug('Initializing app')
-    app = _initialize_object_from_dict(config['application'])
-    log_time('done initializing app')
+    with profiler.span('initialize app', 'startup'):
+        app = _initialize_object_from_dict(config['application'])
+    profiler.checkpoint('done initializing app')
 
     LOG.debug('Loading dialogs')
-    loadDialogs(config['dialogs'])
-    log_time('done loading dialogs')
+    with profiler.span('load dialogs', 'startup'):
+        loadDialogs(config['dialogs'])
+    profiler.checkpoint('done loading dialogs')
 
     LOG.debug('Loading windows')
-    loadWindows(config['windows'])
-    log_time('done loading windows')
+    with profiler.span('load windows', 'startup'):
+        loadWindows(config['windows'])
+    profiler.checkpoint('done loading windows')
 
     LOG.debug('Initializing widgets')
-    app.initialiseWidgets()
-    log_time('done initializing widgets')
+    with profiler.span('initialize widgets', 'startup'):
+        app.initialiseWidgets()
+    profiler.checkpoint('done initializing widgets')
 
     hal_comp.ready()
 
@@ -103,6 +102,9 @@ def launch_application(opts, config):
     # suppress QtQuick warnings
     app.setAttribute(Qt.AA_DontCreateNativeWidgetSiblings)
 
+    # write the startup profile once the event loop is running
+    QTimer.singleShot(0, profiler.finish)
+
     sys.exit(app.exec_())
 
 
@@ -225,7 +227,8 @@ def loadPlugins(plugins):
 def loadWindows(windows):
     for window_id, window_dict in windows.items():
 
-        window = _initialize_object_from_dict(window_dict)
+        with profiler.span(window_id, 'window.init'):
+            window = _initialize_object_from_dict(window_dict)
         qtpyvcp.WINDOWS[window_id] = window
 
         if window_id == 'mainwindow':
@@ -233,11 +236,13 @@ def loadWindows(windows):
 
         # show the window by default
         if window_dict.get('show', True):
-            window.show()
+            with profiler.span(window_id, 'window.show'):
+                window.show()
 
 
 def loadDialogs(dialogs):
     for dialogs_id, dialogs_dict in dialogs.items():
 
-        inst = _initialize_object_from_dict(dialogs_dict)
+        with profiler.span(dialogs_id, 'dialog.init'):
+            inst = _initialize_object_from_dict(dialogs_dict)
         qtpyvcp.DIALOGS[dialogs_id] = inst
@@ -27,6 +27,15 @@ Example:
     # connect the listener to the input pin
     comp.addListener('in', onInChanged)
 
+All the input pins of a component are polled by a single timer. Pins can be
+given a priority class to be read more or less often than the default::
+
+    comp.addPin("jog-counts", "s32", "in", priority="fast")
+    comp.addPin("led-on", "bit", "in", priority="slow")
+
+    # poll intervals in ms of the normal, fast and slow classes
+    comp.setCycleTimes(cycle_time=100, fast_cycle_time=20, slow_cycle_time=500)
+
 """
 
 from qtpyvcp.utilities.logger import getLogger
@@ -37,9 +46,14 @@ COMPONENTS = {}
 LOG = getLogger(__name__)
 
 
-def component(name):
-    """Initializes a new HAL component and registers it."""
-    comp = QComponent(name)
+def component(name, **kwargs):
+    """Initializes a new HAL component and registers it.
+
+    Args:
+        name (str) : The name of the component.
+        **kwargs : The pin poll cycle times, see :class:`QComponent`.
+    """
+    comp = QComponent(name, **kwargs)
     COMPONENTS[name] = comp
     return comp
 
@@ -10,6 +10,9 @@ from qtpyvcp.utilities.logger import getLogger
 
 LOG = getLogger(__name__)
 
+# pin poll priority classes, in order of decreasing poll rate
+PRIORITIES = ('fast', 'normal', 'slow')
+
 
 class QPin(QObject):
     """QPin
@@ -17,11 +20,16 @@ class QPin(QObject):
     QPin is a QObject wrapper for a HAL pin and emits the valueChanged signal
     when the HAL pins value changes.
 
+    Pins created through :meth:`QComponent.addPin` are polled by the
+    component. A pin created on its own can be given a `cycle_time` to poll
+    itself with its own timer.
+
     Args:
         comp (_hal.component) : The HAL comp the pins should belong to.
         name (str) : The name of the HAL pin to create.
         typ (str) : The type of the HAL pin, one of `BOOL`, `FLOAT`, `U32` or `S32`.
         dir (str) : the direction of the HAL pin, one of `IN` or `OUT`.
+        cycle_time (int, optional) : Poll interval in ms for a standalone pin.
 
     Properties:
         value (float | int | bool) : The the current value of the HAL pin.
@@ -30,20 +38,25 @@ class QPin(QObject):
 
     valueChanged = Signal(object)
 
-    def __init__(self, comp, name, typ, dir, cycle_time=100):
+    def __init__(self, comp, name, typ, dir, cycle_time=None):
         super(QPin, self).__init__()
 
         self._pin = _hal.component.newpin(comp, name, typ, dir)
         self._val = self._pin.get()
 
-        self.startTimer(cycle_time)
+        if cycle_time is not None:
+            self.startTimer(cycle_time)
 
-    def timerEvent(self, timer):
+    def poll(self):
+        """Read the pin and emit valueChanged if the value changed."""
         tmp = self._pin.get()
         if tmp != self._val:
             self._val = tmp
             self.valueChanged.emit(tmp)
 
+    def timerEvent(self, timer):
+        self.poll()
+
     @property
     def value(self):
         return self._pin.get()
@@ -56,8 +69,21 @@ class QPin(QObject):
 
 
 class QComponent(QObject):
-    """QComponent"""
-    def __init__(self, comp_name):
+    """QComponent
+
+    All the IN and IO pins of the component are read in a single sweep by
+    one shared timer, and valueChanged is only emitted for the pins that
+    changed. Each pin belongs to a priority class which sets how often it is
+    read: ``fast`` (e.g. jog MPG pins), ``normal`` or ``slow`` (e.g. LEDs).
+
+    Args:
+        comp_name (str) : The name of the HAL component.
+        cycle_time (int) : Poll interval in ms for ``normal`` pins.
+        fast_cycle_time (int) : Poll interval in ms for ``fast`` pins.
+        slow_cycle_time (int) : Poll interval in ms for ``slow`` pins.
+    """
+    def __init__(self, comp_name, cycle_time=100, fast_cycle_time=20,
+                 slow_cycle_time=500):
         super(QComponent, self).__init__()
 
         self.name = comp_name
@@ -81,7 +107,82 @@ class QComponent(QObject):
         self._comp = _hal.component(comp_name)
         self._pins = {}
 
-    def addPin(self, name, type, direction):
+        # pins to poll for each priority class
+        self._poll_pins = {priority: [] for priority in PRIORITIES}
+        self._cycle_times = {}
+        self._poll_every = {}
+        self._tick = 0
+
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._poll)
+
+        self.setCycleTimes(cycle_time, fast_cycle_time, slow_cycle_time)
+
+    def setCycleTimes(self, cycle_time=None, fast_cycle_time=None,
+                      slow_cycle_time=None):
+        """Set the poll intervals of the priority classes.
+
+        Args:
+            cycle_time (int, optional) : Poll interval in ms for ``normal`` pins.
+            fast_cycle_time (int, optional) : Poll interval in ms for ``fast`` pins.
+            slow_cycle_time (int, optional) : Poll interval in ms for ``slow`` pins.
+        """
+        for priority, cycle_time in zip(PRIORITIES, (fast_cycle_time,
+                                                     cycle_time,
+                                                     slow_cycle_time)):
+            if cycle_time is not None:
+                self._cycle_times[priority] = cycle_time
+
+        self._schedule()
+
+    def _schedule(self):
+        """(Re)start the poll timer at the rate of the fastest class in use."""
+        used = [self._cycle_times[p] for p in PRIORITIES if self._poll_pins[p]]
+        if not used:
+            self._timer.stop()
+            return
+
+        interval = min(used)
+        for priority in PRIORITIES:
+            self._poll_every[priority] = max(1, int(round(
+                self._cycle_times[priority] / float(interval))))
+
+        if self._timer.interval() != interval or not self._timer.isActive():
+            self._timer.start(interval)
+
+    def _poll(self):
+        """Read all the polled pins, emitting only for the ones that changed."""
+        self._tick += 1
+        for priority in PRIORITIES:
+            if self._tick % self._poll_every[priority]:
+                continue
+
+            for pin in self._poll_pins[priority]:
+                val = pin._pin.get()
+                if val != pin._val:
+                    pin._val = val
+                    pin.valueChanged.emit(val)
+
+    def addPin(self, name, type, direction, priority='normal'):
+        """Add a pin to the component.
+
+        Args:
+            name (str) : The name of the pin, without the component name.
+            type (str) : The pin type, one of `bit`, `float`, `s32` or `u32`.
+            direction (str) : The pin direction, one of `in`, `out` or `io`.
+            priority (str) : How often IN and IO pins are read, one of
+                `fast`, `normal` or `slow`.
+
+        Returns:
+            QPin : The new pin.
+
+        Raises:
+            ValueError : If `priority` is not a valid priority class.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError("Invalid priority '{}' for HAL pin {}.{}, must be "
+                             "one of: {}".format(priority, self.name, name,
+                                                 ', '.join(PRIORITIES)))
 
         pin_type = self.type_map.get(type.lower())
         pin_dir = self.dir_map.get(direction.lower())
@@ -90,6 +191,12 @@ class QComponent(QObject):
 
         pin = QPin(self._comp, name, pin_type, pin_dir)
         self._pins[name] = pin
+
+        # OUT pins are only written by us, so there is no need to poll them
+        if pin_dir != hal.HAL_OUT:
+            self._poll_pins[priority].append(pin)
+            self._schedule()
+
         return pin
 
     def getPin(self, pin_name):
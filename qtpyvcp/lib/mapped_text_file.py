@@ -0,0 +1,106 @@
+"""Line based access to large text files.
+
+A :class:`MappedTextFile` memory maps a file and indexes the start of every
+``stride``-th line, so any range of lines can be read without loading the
+whole file, or keeping an offset for each line in memory. Finding a line
+costs at most ``stride`` newline searches from the nearest indexed line.
+"""
+
+import os
+import mmap
+
+import numpy as np
+
+
+class MappedTextFile(object):
+    """Read only, memory mapped text file.
+
+    Args:
+        filename (str) : The file to open.
+        stride (int, optional) : Index the offset of every `stride` lines.
+        encoding (str, optional) : The encoding used to decode lines.
+    """
+
+    def __init__(self, filename, stride=1024, encoding='utf-8'):
+        self.filename = filename
+        self.encoding = encoding
+
+        self._stride = stride
+        self._fh = open(filename, 'rb')
+
+        self.size = os.fstat(self._fh.fileno()).st_size
+        if self.size == 0:
+            # empty files can't be mapped
+            self._map = b''
+        else:
+            self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._index, self.line_count = self._buildIndex()
+
+    def _buildIndex(self, chunk_size=16 * 1024 * 1024):
+        stride = self._stride
+        index = [0]
+        newlines = 0
+
+        for pos in range(0, self.size, chunk_size):
+            count = min(chunk_size, self.size - pos)
+            chunk = np.frombuffer(self._map, dtype=np.uint8, count=count, offset=pos)
+            found = np.flatnonzero(chunk == 10)
+            del chunk
+
+            # line n starts after newline n - 1, pick the newlines that
+            # precede the lines that are a multiple of stride
+            first = (-newlines - 1) % stride
+            index.extend((found[first::stride] + pos + 1).tolist())
+            newlines += len(found)
+
+        line_count = newlines
+        if self.size and self._map[self.size - 1:self.size] != b'\n':
+            # last line without a trailing newline
+            line_count += 1
+
+        return index, line_count
+
+    def lineOffset(self, line):
+        """Returns the byte offset of the start of `line` (0 based)."""
+        if line >= self.line_count:
+            return self.size
+
+        pos = self._index[max(0, line) // self._stride]
+        for i in range(max(0, line) % self._stride):
+            pos = self._map.find(b'\n', pos)
+            if pos < 0:
+                return self.size
+            pos += 1
+        return pos
+
+    def lines(self, first, count):
+        """Read a range of lines.
+
+        Args:
+            first (int) : The first line to read (0 based).
+            count (int) : The number of lines to read.
+
+        Returns:
+            str : The decoded lines, without the trailing newline.
+        """
+        start = self.lineOffset(first)
+        end = start
+        for i in range(max(0, min(count, self.line_count - first))):
+            end = self._map.find(b'\n', end) + 1
+            if end == 0:
+                end = self.size
+                break
+
+        data = self._map[start:end]
+        if data.endswith(b'\n'):
+            data = data[:-1]
+        if data.endswith(b'\r'):
+            data = data[:-1]
+
+        return data.decode(self.encoding, 'replace')
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._fh.close()
@@ -0,0 +1,87 @@
+"""Index of a LinuxCNC parameter file.
+
+The interpreter saves the persistent numbered parameters to the
+``[RS274NGC] PARAMETER_FILE`` (usually ``linuxcnc.var``), one parameter per
+line as ``<number> <value>``. A :class:`ParameterFile` reads the file in one
+pass into a dict keyed by parameter number, and only re-reads it when its
+mtime, size or inode changed.
+
+Some of the parameters kept in the file:
+
+* 31-5000 -- user parameters
+* 5161-5169 -- G28 home position, XYZABCUVW
+* 5181-5189 -- G30 home position, XYZABCUVW
+* 5211-5219 -- G92 offset, XYZABCUVW
+* 5220 -- the active coordinate system, 1-9 for G54-G59.3
+* 5221-5230 -- G54 offset XYZABCUVW and rotation, G55 to G59.3 follow in
+  steps of 20 up to 5390
+"""
+
+import os
+
+
+class ParameterFile(object):
+    """Numbered parameters read from a parameter file.
+
+    Args:
+        filename (str) : Path of the parameter file.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.values = {}
+
+        # (mtime, size, inode) of the file when last read
+        self._stat = None
+
+    def load(self, force=False):
+        """Read the file if it changed since the last load.
+
+        Args:
+            force (bool, optional) : Read the file even if it has not changed.
+
+        Returns:
+            dict : The parameters that changed, mapped to their new value or
+                to None if the parameter is no longer in the file.
+        """
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return {}
+
+        file_stat = (st.st_mtime, st.st_size, st.st_ino)
+        if file_stat == self._stat and not force:
+            return {}
+
+        values = {}
+        with open(self.filename, 'r') as fh:
+            for line in fh:
+                fields = line.split(None, 2)
+                if len(fields) < 2:
+                    continue
+                try:
+                    values[int(fields[0])] = float(fields[1])
+                except ValueError:
+                    continue
+
+        old_values = self.values
+        changes = {number: value for number, value in values.items()
+                   if old_values.get(number) != value}
+        changes.update((number, None) for number in old_values
+                       if number not in values)
+
+        self._stat = file_stat
+        self.values = values
+
+        return changes
+
+    def get(self, number, default=0.0):
+        """Returns the value of parameter `number`, or `default` if it is not
+        in the file."""
+        return self.values.get(number, default)
+
+    def getRange(self, first, count, default=0.0):
+        """Returns a list of the values of `count` consecutive parameters,
+        starting at parameter `first`."""
+        get = self.values.get
+        return [get(number, default) for number in range(first, first + count)]
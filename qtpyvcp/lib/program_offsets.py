@@ -0,0 +1,133 @@
+"""Work offsets used when generating a program preview.
+
+The backplots bake the G5x, G92 and XY rotation offsets that are active when
+a program is parsed into the preview geometry. When one of those offsets
+changes later, for example after touching off an axis, re-running the
+interpreter over the whole program is only needed if the program itself
+depends on the offsets. Otherwise the change can be applied to the existing
+geometry as a transform.
+
+A :class:`ProgramOffsets` instance is fed the offset callbacks the
+interpreter makes on the canon while parsing, and afterwards tells whether
+the preview can be transformed and by how much.
+"""
+
+import re
+import math
+
+# numbered parameters #5211-#5390 hold the G92 and G54-G59.3 offsets and
+# rotations, #<_coord_system> the active coordinate system
+_OFFSET_PARAM_RE = re.compile(br'#\s*(?:5[23]\d\d(?!\d)|<\s*_coord_system\s*>)',
+                              re.IGNORECASE)
+
+
+def readsOffsetParameters(filename, buf_size=1024 * 1024):
+    """Check if a program reads the offset parameters.
+
+    Only the program file itself is checked, not any subroutine files it
+    calls.
+
+    Args:
+        filename (str) : The program file to check.
+
+    Returns:
+        bool : True if the program references any of the offset parameters.
+    """
+    tail = b''
+    with open(filename, 'rb') as fh:
+        buf = fh.read(buf_size)
+        while buf:
+            # keep the end of the last chunk in case a match spans chunks
+            if _OFFSET_PARAM_RE.search(tail + buf):
+                return True
+            tail = buf[-32:]
+            buf = fh.read(buf_size)
+    return False
+
+
+class ProgramOffsets(object):
+    """Records the offsets a program was parsed with.
+
+    The canon should call :meth:`setG5xOffset`, :meth:`setG92Offset` and
+    :meth:`setRotation` from its ``set_g5x_offset``, ``set_g92_offset`` and
+    ``set_xy_rotation`` callbacks. Offsets are recorded in canon units.
+    """
+
+    def __init__(self):
+        self.g5x = {}
+        self.rotation = {}
+        self.g92 = None
+        self.index = None
+
+        # set if the program changes the offsets itself
+        self.modified = False
+        # set if the program reads the offset parameters
+        self.reads_parameters = False
+
+    @property
+    def dependent(self):
+        """bool : Whether the program geometry depends on the offsets, in
+        which case offset changes require the program to be re-parsed."""
+        return self.modified or self.reads_parameters
+
+    @property
+    def indexes(self):
+        """list : The coordinate systems used by the program."""
+        return list(self.g5x.keys())
+
+    def setG5xOffset(self, index, x, y, z):
+        offset = (x, y, z)
+        if index not in self.g5x:
+            self.g5x[index] = offset
+        elif self.g5x[index] != offset:
+            self.modified = True
+        self.index = index
+
+    def setG92Offset(self, x, y, z):
+        offset = (x, y, z)
+        if self.g92 is None:
+            self.g92 = offset
+        elif self.g92 != offset:
+            self.modified = True
+
+    def setRotation(self, rotation):
+        if self.index is None:
+            return
+        if self.index not in self.rotation:
+            self.rotation[self.index] = rotation
+        elif self.rotation[self.index] != rotation:
+            self.modified = True
+
+    def transform(self, index, g5x, rotation, g92, scale=1.0):
+        """Compute the transform from the parsed offsets to new offsets.
+
+        A point ``p`` parsed in coordinate system `index` maps to
+        ``rotate(p + pre, delta_rotation) + post`` under the new offsets.
+
+        Args:
+            index (int) : The coordinate system, as passed to setG5xOffset.
+            g5x (tuple) : The new XYZ offset of the coordinate system.
+            rotation (float) : The new XY rotation in degrees.
+            g92 (tuple) : The new XYZ G92 offset.
+            scale (float, optional) : Factor to convert the recorded offsets
+                to the units of the new offsets.
+
+        Returns:
+            tuple : ``(pre, delta_rotation, post)``, `pre` and `post` are
+                XYZ translations and `delta_rotation` is in degrees.
+        """
+        parsed_g5x = [v * scale for v in self.g5x.get(index, (0.0, 0.0, 0.0))]
+        parsed_g92 = [v * scale for v in (self.g92 or (0.0, 0.0, 0.0))]
+        parsed_rotation = self.rotation.get(index, 0.0)
+
+        dx, dy, dz = [new - old for new, old in zip(g92[:3], parsed_g92)]
+
+        theta = math.radians(rotation)
+        cos, sin = math.cos(theta), math.sin(theta)
+
+        pre = [-v for v in parsed_g5x]
+        post = [g5x[0] + dx * cos - dy * sin,
+                g5x[1] + dx * sin + dy * cos,
+                g5x[2] + dz]
+
+        return pre, rotation - parsed_rotation, post
@@ -0,0 +1,138 @@
+"""Table driven change detection for ``linuxcnc.stat`` style objects.
+
+A :class:`StatDiffer` is built once from a list of field names.  On each
+call to :meth:`StatDiffer.diff` all fields are read from the source in a
+single ``operator.attrgetter`` (or ``itemgetter``) call, numeric scalars are
+packed into a typed ``array('d')`` and everything else is kept as a tuple.
+The two snapshots are compared against the previous ones in bulk, and only if
+one of them differs are the individual fields inspected to find which ones
+changed.  In the common case where nothing changed this costs a couple of C
+level comparisons instead of a Python ``getattr`` and ``!=`` per field.
+"""
+
+from array import array
+from numbers import Number
+from operator import attrgetter
+
+# value that never compares equal, used to force a field to be reported
+_INVALID = object()
+
+
+def _multigetter(getter, fields):
+    """Returns a callable that fetches `fields` from a source as a tuple."""
+    if len(fields) == 0:
+        return lambda source: ()
+    elif len(fields) == 1:
+        get = getter(fields[0])
+        return lambda source: (get(source),)
+    return getter(*fields)
+
+
+def _isScalar(value):
+    return isinstance(value, Number) and not isinstance(value, complex)
+
+
+class StatDiffer(object):
+    """Bulk change detector for a fixed set of fields.
+
+    Args:
+        fields (iterable) : Names (or keys) of the fields to track.
+        values (dict) : The baseline value for each field. Fields are reported
+            as changed on the first :meth:`diff` if the source differs from
+            the baseline.
+        getter (callable, optional) : Factory used to build the field getter,
+            ``operator.attrgetter`` (default) for objects or
+            ``operator.itemgetter`` for dicts.
+    """
+
+    def __init__(self, fields, values, getter=attrgetter):
+        self._getter = getter
+        self.setFields(fields, values)
+
+    @property
+    def fields(self):
+        """tuple : All the fields being tracked."""
+        return self._num_fields + self._obj_fields
+
+    def setFields(self, fields, values):
+        """(Re)build the field tables.
+
+        Fields holding numeric scalars are tracked in a typed array, all
+        others are tracked as a tuple of python objects.
+
+        Args:
+            fields (iterable) : Names of the fields to track.
+            values (dict) : Baseline values for the fields.
+        """
+        fields = tuple(fields)
+        self._num_fields = tuple(f for f in fields if _isScalar(values[f]))
+        self._obj_fields = tuple(f for f in fields
+                                 if f not in self._num_fields)
+
+        self._get_num = _multigetter(self._getter, self._num_fields)
+        self._get_obj = _multigetter(self._getter, self._obj_fields)
+
+        self._num_old = array('d', [values[f] for f in self._num_fields])
+        self._obj_old = tuple(values[f] for f in self._obj_fields)
+
+    def invalidate(self, field):
+        """Force `field` to be reported as changed on the next diff.
+
+        Args:
+            field (str) : The name of the field to invalidate.
+        """
+        if field in self._num_fields:
+            self._num_old[self._num_fields.index(field)] = float('nan')
+        elif field in self._obj_fields:
+            index = self._obj_fields.index(field)
+            old = list(self._obj_old)
+            old[index] = _INVALID
+            self._obj_old = tuple(old)
+
+    def diff(self, source):
+        """Compare the current state of `source` with the last snapshot.
+
+        Args:
+            source : The object (or dict) to read the fields from.
+
+        Returns:
+            list : ``(field, new_value)`` tuples for each changed field.
+        """
+        changed = []
+
+        num_vals = self._get_num(source)
+        try:
+            num_new = array('d', num_vals)
+        except TypeError:
+            # a field changed type (e.g. became None), fall back to
+            # rebuilding the tables with the new values as the baseline
+            return self._rebuild(source)
+
+        if num_new != self._num_old:
+            old = self._num_old
+            fields = self._num_fields
+            for i in range(len(fields)):
+                if num_new[i] != old[i]:
+                    changed.append((fields[i], num_vals[i]))
+            self._num_old = num_new
+
+        obj_new = self._get_obj(source)
+        if obj_new != self._obj_old:
+            old = self._obj_old
+            fields = self._obj_fields
+            for i in range(len(fields)):
+                if obj_new[i] is not old[i] and obj_new[i] != old[i]:
+                    changed.append((fields[i], obj_new[i]))
+            self._obj_old = obj_new
+
+        return changed
+
+    def _rebuild(self, source):
+        fields = self.fields
+        old = dict(zip(self._num_fields, self._num_old))
+        old.update(zip(self._obj_fields, self._obj_old))
+        new = dict(zip(fields, _multigetter(self._getter, fields)(source)))
+
+        changed = [(f, new[f]) for f in fields if new[f] != old[f]]
+        self.setFields(fields, new)
+        return changed
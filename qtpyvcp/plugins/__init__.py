@@ -10,8 +10,10 @@ import importlib
 
 from collections import OrderedDict
 
+from qtpyvcp.utilities import profiler
 from qtpyvcp.utilities.logger import getLogger
-from qtpyvcp.plugins.base_plugins import Plugin, DataPlugin, DataChannel
+from qtpyvcp.plugins.base_plugins import Plugin, DataPlugin, DataChannel, \
+    batchUpdates, coalesced
 
 LOG = getLogger(__name__)
 
@@ -68,7 +70,8 @@ def registerPluginFromClass(plugin_id, plugin_cls, args=[], kwargs={}):
         modname, sep, clsname = plugin_cls.partition(':')
 
         try:
-            plugin_cls = getattr(importlib.import_module(modname), clsname)
+            with profiler.span(plugin_id, 'plugin.import', provider=plugin_cls):
+                plugin_cls = getattr(importlib.import_module(modname), clsname)
         except Exception:
             LOG.critical("Failed to import data plugin.")
             raise
@@ -76,7 +79,8 @@ def registerPluginFromClass(plugin_id, plugin_cls, args=[], kwargs={}):
     assert issubclass(plugin_cls, Plugin), "Not a valid plugin, must be a qtpyvcp.plugins.Plugin subclass."
 
     try:
-        inst = plugin_cls(*args, **kwargs)
+        with profiler.span(plugin_id, 'plugin.init'):
+            inst = plugin_cls(*args, **kwargs)
         registerPlugin(plugin_id, inst)
         return inst
     except TypeError:
@@ -114,7 +118,8 @@ def initialisePlugins():
     """
     for plugin_id, plugin_inst in _PLUGINS.items():
         LOG.debug("Initializing '%s' plugin", plugin_id)
-        plugin_inst.initialise()
+        with profiler.span(plugin_id, 'plugin.initialise'):
+            plugin_inst.initialise()
 
 
 def postGuiInitialisePlugins(main_window):
@@ -126,7 +131,8 @@ def postGuiInitialisePlugins(main_window):
     """
     for plugin_id, plugin_inst in _PLUGINS.items():
         LOG.debug("Post GUI Initializing '%s' plugin", plugin_id)
-        plugin_inst.postGuiInitialise(main_window)
+        with profiler.span(plugin_id, 'plugin.postGuiInitialise'):
+            plugin_inst.postGuiInitialise(main_window)
 
 
 def terminatePlugins():
@@ -1,5 +1,8 @@
 import inspect
 
+from collections import OrderedDict
+from contextlib import contextmanager
+
 from qtpy.QtCore import QObject, Signal
 from qtpyvcp.utilities.logger import getLogger, logLevelFromName
 
@@ -56,6 +59,82 @@ def isDataChan(obj):
     return isinstance(obj, DataChannel)
 
 
+class _ChannelBatch(object):
+    """Pending channel updates and slot calls of the active batch."""
+    def __init__(self):
+        self.depth = 0
+        self.channels = OrderedDict()  # chan: value passed to setValue
+        self.calls = OrderedDict()     # coalesced slot: None
+
+_BATCH = _ChannelBatch()
+
+
+@contextmanager
+def batchUpdates():
+    """Collect channel updates and notify listeners once at the end.
+
+    While a batch is active ``DataChannel.setValue`` only records the new
+    value. When the outermost batch exits each changed channel emits its
+    signal once with its final value, and then each :func:`coalesced` slot
+    that was triggered is called once.
+
+    Example::
+
+        with batchUpdates():
+            STATUS.position.setValue(pos)
+            STATUS.dtg.setValue(dtg)
+    """
+    _BATCH.depth += 1
+    try:
+        yield
+    finally:
+        _BATCH.depth -= 1
+        if _BATCH.depth == 0:
+            _commitBatch()
+
+
+def _commitBatch():
+    # emitting can trigger further updates, so keep going
+    # until nothing is pending, but still defer those updates
+    _BATCH.depth += 1
+    try:
+        while _BATCH.channels or _BATCH.calls:
+            while _BATCH.channels:
+                chan, value = _BATCH.channels.popitem(last=False)
+                chan._setValue(value)
+
+            if _BATCH.calls:
+                slot, none = _BATCH.calls.popitem(last=False)
+                try:
+                    slot()
+                except Exception:
+                    LOG.exception("Error calling coalesced slot %s", slot)
+    finally:
+        _BATCH.depth -= 1
+
+
+def coalesced(slot):
+    """Wrap a slot so it is only called once per batch.
+
+    Useful for slots connected to several channels that change together,
+    like a position calculation connected to both ``position`` and
+    ``g5x_offset``. The slot is called without arguments, so it should read
+    the channel values it needs. Outside of a batch it is called directly.
+
+    Args:
+        slot (callable) : The slot to wrap.
+
+    Returns:
+        callable : Wrapped slot, keep a reference to it to disconnect it.
+    """
+    def inner(*args, **kwargs):
+        if _BATCH.depth > 0:
+            _BATCH.calls[slot] = None
+        else:
+            slot()
+    return inner
+
+
 class DataPlugin(Plugin):
     """DataPlugin."""
 
@@ -119,6 +198,10 @@ class DataChannel(QObject):
 
     signal = Signal(object)
 
+    # emitted with the new number of subscribers whenever a slot
+    # is connected to or disconnected from ``signal``
+    subscriptionChanged = Signal(int)
+
     def __init__(self, fget=None, fset=None, fstr=None, data=None, settable=False,
                  doc = None):
         super(DataChannel, self).__init__()
@@ -127,7 +210,13 @@ class DataChannel(QObject):
         self.fset = fset
         self.fstr = fstr
 
-        self.value = data
+        # called with the channel before ``value`` is read while the channel
+        # has no subscribers, so that the owner can refresh a value it does
+        # not otherwise keep up to date
+        self.fupdate = None
+
+        self._value = data
+        self._subscribers = 0
 
         self.settable = settable
         self.instance = None
@@ -136,6 +225,36 @@ class DataChannel(QObject):
             doc = fget.__doc__
         self.__doc__ = doc
 
+    @property
+    def value(self):
+        if self.fupdate is not None and self._subscribers == 0:
+            self.fupdate(self)
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    @property
+    def subscribed(self):
+        """True if any slots are connected to the channel's signal."""
+        return self._subscribers > 0
+
+    def connectNotify(self, signal):
+        if signal.name().data() == b'signal':
+            self._updateSubscribers()
+
+    def disconnectNotify(self, signal):
+        # signal is invalid if all connections were removed at once
+        if not signal.isValid() or signal.name().data() == b'signal':
+            self._updateSubscribers()
+
+    def _updateSubscribers(self):
+        count = self.receivers(self.signal)
+        if count != self._subscribers:
+            self._subscribers = count
+            self.subscriptionChanged.emit(count)
+
     def getValue(self, *args, **kwargs):
         """Channel data getter method."""
         if self.fget is None:
@@ -149,7 +268,20 @@ class DataChannel(QObject):
         return self.fstr(self.instance, self, *args, **kwargs)
 
     def setValue(self, value):
-        """Channel data setter method."""
+        """Channel data setter method.
+
+        If a :func:`batchUpdates` batch is active the value is stored, and
+        the listeners are notified once with the final value when the
+        batch ends.
+        """
+        if _BATCH.depth > 0:
+            if self.fset is None:
+                self.value = value
+            _BATCH.channels[self] = value
+            return
+        self._setValue(value)
+
+    def _setValue(self, value):
         if self.fset is None:
             self.value = value
             self.signal.emit(value)
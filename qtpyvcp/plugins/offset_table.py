@@ -22,6 +22,9 @@ Offset Table data plugin.
 Exposes all the info available in the Offset table. Watches the
 offset table for changes and re-loads as needed.
 
+The numbered parameters saved in the parameter file are also available,
+see the ``parameter``, ``g28_position`` and ``g30_position`` channels.
+
 Offset Table YAML configuration:
 
 .. code-block:: yaml
@@ -40,6 +43,7 @@ import linuxcnc
 
 from qtpy.QtCore import QFileSystemWatcher, QTimer, Signal
 
+from qtpyvcp.lib.parameter_file import ParameterFile
 from qtpyvcp.utilities.info import Info
 from qtpyvcp.utilities.logger import getLogger
 from qtpyvcp.plugins import DataPlugin, DataChannel, getPlugin
@@ -53,6 +57,15 @@ STATUS = getPlugin('status')
 STAT = STATUS.stat
 INFO = Info()
 
+AXES = 'XYZABCUVW'
+
+# first parameter of the G54 offsets, G55 to G59.3 follow in steps of 20
+G5X_FIRST_PARAMETER = 5221
+G5X_PARAMETER_STEP = 20
+
+G28_FIRST_PARAMETER = 5161
+G30_FIRST_PARAMETER = 5181
+
 
 def merge(a, b):
     """Shallow merge two dictionaries"""
@@ -110,8 +123,10 @@ class OffsetTable(DataPlugin):
         file_name = INFO.getParameterFile()
 
         self.parameter_file = None
+        self.parameters = None
         if file_name:
             self.parameter_file = os.path.join(os.path.dirname(os.path.realpath(file_name)), file_name)
+            self.parameters = ParameterFile(self.parameter_file)
 
         self.fs_watcher = None
 
@@ -126,6 +141,9 @@ class OffsetTable(DataPlugin):
         self.g5x_offset_table = self.DEFAULT_OFFSET.copy()
         self.current_index = STATUS.stat.g5x_index
 
+        # the offsets as last loaded or saved, used to find modified values
+        self._saved_offsets = {}
+
         self.loadOffsetTable()
 
         self.status.g5x_index.notify(self.setCurrentOffsetNumber)
@@ -158,6 +176,62 @@ class OffsetTable(DataPlugin):
         """
         return self.current_offset
 
+    @DataChannel
+    def parameter(self, chan, number=None):
+        """Numbered parameter saved in the parameter file
+
+        The channel is notified with a dict of the parameters that changed,
+        mapped to their new value, or None if removed from the file.
+
+        Rules channel syntax::
+
+            offsettable:parameter?5161
+
+        :param number: the number of the parameter to get
+        :return: float, or dict of all the parameters if no number is given
+        """
+        if self.parameters is None:
+            return {} if number is None else 0.0
+        if number is None:
+            return self.parameters.values.copy()
+        return self.parameters.get(int(number))
+
+    @DataChannel
+    def g28_position(self, chan, axis=None):
+        """G28 home position
+
+        Rules channel syntax::
+
+            offsettable:g28_position
+            offsettable:g28_position?X
+
+        :param axis: the axis letter to get the position of
+        :return: list, float
+        """
+        return self._axisParameters(G28_FIRST_PARAMETER, axis)
+
+    @DataChannel
+    def g30_position(self, chan, axis=None):
+        """G30 home position
+
+        Rules channel syntax::
+
+            offsettable:g30_position
+            offsettable:g30_position?X
+
+        :param axis: the axis letter to get the position of
+        :return: list, float
+        """
+        return self._axisParameters(G30_FIRST_PARAMETER, axis)
+
+    def _axisParameters(self, first, axis=None):
+        if axis is not None:
+            number = first + AXES.index(axis[0].upper())
+            return self.parameters.get(number) if self.parameters else 0.0
+        if self.parameters is None:
+            return [0.0] * len(AXES)
+        return self.parameters.getRange(first, len(AXES))
+
     def initialise(self):
         self.fs_watcher = QFileSystemWatcher([self.parameter_file])
         self.fs_watcher.fileChanged.connect(self.onParamsFileChanged)
@@ -218,29 +292,32 @@ class OffsetTable(DataPlugin):
 
     def loadOffsetTable(self):
 
-        if self.parameter_file:
-            with open(self.parameter_file, 'r') as fh:
-                for line in fh:
-                    param, data = int(line.split()[0]), float(line.split()[1])
-
-                    if 5230 >= param >= 5221:
-                        self.g5x_offset_table.get(0)[param - 5221] = data
-                    elif 5250 >= param >= 5241:
-                        self.g5x_offset_table.get(1)[param - 5241] = data
-                    elif 5270 >= param >= 5261:
-                        self.g5x_offset_table.get(2)[param - 5261] = data
-                    elif 5290 >= param >= 5281:
-                        self.g5x_offset_table.get(3)[param - 5281] = data
-                    elif 5310 >= param >= 5301:
-                        self.g5x_offset_table.get(4)[param - 5301] = data
-                    elif 5330 >= param >= 5321:
-                        self.g5x_offset_table.get(5)[param - 5321] = data
-                    elif 5350 >= param >= 5341:
-                        self.g5x_offset_table.get(6)[param - 5341] = data
-                    elif 5370 >= param >= 5361:
-                        self.g5x_offset_table.get(7)[param - 5361] = data
-                    elif 5390 >= param >= 5381:
-                        self.g5x_offset_table.get(8)[param - 5381] = data
+        if self.parameters is not None:
+            # only re-reads the file if it changed
+            changes = self.parameters.load()
+
+            values = self.parameters.values
+            for index in range(len(self.ROW_LABELS)):
+                offsets = self.g5x_offset_table.get(index)
+                first = G5X_FIRST_PARAMETER + index * G5X_PARAMETER_STEP
+                for column in range(len(offsets)):
+                    value = values.get(first + column)
+                    if value is not None:
+                        offsets[column] = value
+
+            if changes:
+                self.parameter.setValue(changes)
+
+                if any(G28_FIRST_PARAMETER <= number < G28_FIRST_PARAMETER + len(AXES)
+                       for number in changes):
+                    self.g28_position.setValue(self._axisParameters(G28_FIRST_PARAMETER))
+
+                if any(G30_FIRST_PARAMETER <= number < G30_FIRST_PARAMETER + len(AXES)
+                       for number in changes):
+                    self.g30_position.setValue(self._axisParameters(G30_FIRST_PARAMETER))
+
+        self._saved_offsets = {index: list(offsets)
+                               for index, offsets in self.g5x_offset_table.items()}
 
         self.offset_table_changed.emit(self.g5x_offset_table)
 
@@ -252,6 +329,11 @@ class OffsetTable(DataPlugin):
     def saveOffsetTable(self, offset_table, columns):
         """ Stores the offset table in memory.
 
+        Only the values that differ from the last loaded or saved offsets are
+        written, with one ``G10 L2`` command per modified coordinate system.
+        The commands are issued in a single MDI call, so there is only one
+        mode switch however many systems changed.
+
         Args:
             offset_table (dict) : Dictionary of dictionaries containing
                 the tool data to write to the file.
@@ -260,17 +342,34 @@ class OffsetTable(DataPlugin):
         """
         self.g5x_offset_table = offset_table
 
+        columns = self.validateColumns(columns) or self.columns
+
+        mdi_commands = []
+        written = []
         for index in range(len(self.rows)):
-            mdi_list = list()
-            mdi_list.append("G10 L2")
-            mdi_list.append("P{}".format(index+1))
+            offsets = self.g5x_offset_table[index]
+            saved = self._saved_offsets.setdefault(index, [None] * len(self.COLUMN_LABELS))
 
+            mdi_list = list()
             for char in columns:
 
-                column_index = self.columns.index(char)
+                column_index = self.COLUMN_LABELS.index(char)
+                if offsets[column_index] == saved[column_index]:
+                    continue
+
+                mdi_list.append("{}{}".format(char, offsets[column_index]))
+                written.append((saved, column_index, offsets[column_index]))
 
-                mdi_list.append("{}{}".format(char, self.g5x_offset_table[index][column_index]))
+            if mdi_list:
+                mdi_commands.append("G10 L2 P{} {}".format(index + 1, " ".join(mdi_list)))
 
-            mdi_command = " ".join(mdi_list)
+        if not mdi_commands:
+            LOG.debug("No offsets modified, nothing to save")
+            return
+
+        if not issue_mdi(";".join(mdi_commands)):
+            # leave the values modified, so they are written on the next save
+            return
 
-            issue_mdi(mdi_command)
+        for saved, column_index, value in written:
+            saved[column_index] = value
@@ -10,6 +10,9 @@ Usage:
         position:abs?string&axis=x        # returns X axis absolute position
         position:rel?string&axis=x        # returns X axis relative position
         position:dtg?string&axis=x        # returns X axis DTG value
+        position:joint?string&joint=0     # returns joint 0 position
+        position:rel?axis=x&deadband=0.01 # X axis relative position, only
+                                          # notified on moves of 0.01 or more
 
 
 YAML configuration:
@@ -29,16 +32,32 @@ This goes in your config.yml file in the `data_plugins` section.
           metric_format: "%9.3f"
           # format used for imperial units
           imperial_format: "%8.4f"
-
-ToDO:
-    Add joint positions.
+          # default change threshold of the per-axis channels, if not set
+          # half the last digit of the current format is used
+          deadband: 0.0005
+
+The offsets, XY rotation and unit conversion are combined into a transform
+that is only rebuilt when one of them changes, so a position update is a
+single pass over the axes.
+
+Widgets that display formatted values, like the DROs, can get a shared
+string channel from :meth:`Position.stringChannel`. Each axis, reference
+type and format is formatted once per position update however many widgets
+show it, and the channel only emits when the string changes.
+
+The ``rel``, ``abs`` and ``dtg`` channels are notified with all the axes
+when any of them changes. Per-axis channels from :meth:`Position.axisChannel`
+are only notified when their axis moves by more than a deadband, so noise
+in the actual position does not cause updates.
 """
 
+import re
 import math
+from functools import partial
 
 from qtpyvcp.utilities.info import Info
 from qtpyvcp.utilities.logger import getLogger
-from qtpyvcp.plugins import DataPlugin, DataChannel, getPlugin
+from qtpyvcp.plugins import DataPlugin, DataChannel, getPlugin, coalesced
 
 STATUS = getPlugin('status')
 STAT = STATUS.stat
@@ -47,6 +66,9 @@ INFO = Info()
 # Set up logging
 LOG = getLogger(__name__)
 
+FORMAT_PRECISION = re.compile(r'\.(\d+)[fFeEgG]')
+
+AXIS_LETTERS = 'xyzabcuvw'
 MACHINE_COORDS = INFO.getCoordinates()
 MACHINE_UNITS = 2 if INFO.getIsMachineMetric() else 1
 
@@ -60,26 +82,56 @@ else:
     CONVERSION_FACTORS = [25.4] * 3 + [1] * 3 + [25.4] * 3
 
 
+def deadbandForFormat(fmt):
+    """Returns half the value of the last digit shown by a %-format."""
+    match = FORMAT_PRECISION.search(fmt)
+    if match is None:
+        return 0.0
+    return 0.5 * 10 ** -int(match.group(1))
+
+
 class Position(DataPlugin):
     """Positions Plugin"""
     def __init__(self, report_actual_pos=False, use_program_units=True,
-                 metric_format='%9.3f', imperial_format='%8.4f'):
+                 metric_format='%9.3f', imperial_format='%8.4f', deadband=None):
         super(Position, self).__init__()
 
         self._report_actual_pos = False
         self._use_program_units = use_program_units
         self._metric_format = metric_format
         self._imperial_format = imperial_format
+        self._deadband = deadband
 
         self._current_format = self._imperial_format
+        self._auto_deadband = deadbandForFormat(self._current_format)
+
+        # (offset, scale, g92, rotation, factors, joint_factors),
+        # see _buildTransform
+        self._transform = None
+
+        # (source channel, anum, format, scale): string DataChannel
+        self._string_channels = {}
+        # (source channel, anum, deadband): float DataChannel
+        self._axis_channels = {}
+
+        self.joint.fupdate = lambda chan: self._updateJoints()
 
         self._update()
 
-        # all these should cause the positions to update
-        STATUS.position.signal.connect(self._update)
-        STATUS.g5x_offset.signal.connect(self._update)
-        STATUS.g92_offset.signal.connect(self._update)
-        STATUS.tool_offset.signal.connect(self._update)
+        # the transform has to be rebuilt when any of these change, connect
+        # first so it is invalid before the positions are updated
+        for chan in (STATUS.g5x_offset, STATUS.g92_offset,
+                     STATUS.tool_offset, STATUS.rotation_xy):
+            chan.signal.connect(self._invalidateTransform)
+
+        # all these should cause the positions to update, but only
+        # once per status cycle even if several of them changed
+        self._update_slot = coalesced(self._update)
+        STATUS.position.signal.connect(self._update_slot)
+        STATUS.g5x_offset.signal.connect(self._update_slot)
+        STATUS.g92_offset.signal.connect(self._update_slot)
+        STATUS.tool_offset.signal.connect(self._update_slot)
+        STATUS.rotation_xy.signal.connect(self._update_slot)
         STATUS.program_units.signal.connect(self.updateUnits)
 
         self.report_actual_pos = report_actual_pos
@@ -116,6 +168,15 @@ class Position(DataPlugin):
                 except ValueError:
                     kwargs['anum'] = 'xyzabcuvw'.index(str(axis).lower())
 
+            if 'joint' in kwargs:
+                kwargs['jnum'] = int(kwargs.pop('joint'))
+
+            if 'deadband' in kwargs:
+                chan_obj = self.axisChannel(chan, kwargs.pop('anum'),
+                                            float(kwargs.pop('deadband')))
+                chan_exp = lambda: chan_obj.value
+                return chan_obj, chan_exp
+
             if len(args) > 0 and args[0] in ('string', 'text', 'str'):
                 chan_exp = lambda: chan_obj.getString(*args[1:], **kwargs)
             else:
@@ -134,6 +195,9 @@ class Position(DataPlugin):
         else:
             self._current_format = self._imperial_format
 
+        self._auto_deadband = deadbandForFormat(self._current_format)
+
+        self._invalidateTransform()
         self._update()
 
     @DataChannel
@@ -209,6 +273,122 @@ class Position(DataPlugin):
     def dtg(self, chan, anum):
         return self._current_format % chan.value[anum]
 
+    @DataChannel
+    def joint(self, chan, jnum=-1):
+        """The current joint positions
+
+        To get a single joint pass string and the joint number::
+
+            position:joint?string&joint=0
+
+        To get a tuple of all the joints pass only string::
+
+            position:joint?
+
+        :returns: current joint positions
+        :rtype: tuple, str
+        """
+
+        if jnum == -1:
+            return chan.value
+        return chan.value[jnum]
+
+    @joint.tostring
+    def joint(self, chan, jnum):
+        return self._current_format % chan.value[jnum]
+
+    def stringChannel(self, ref_type, anum, fmt, scale=1):
+        """Get a channel with the formatted position of an axis.
+
+        The channel is shared by all the callers that pass the same
+        arguments. Its value is updated with the positions, but it is only
+        notified when the formatted string changes, e.g. when the last
+        displayed digit changes.
+
+        Args:
+            ref_type (str) : The position channel, ``rel``, ``abs`` or
+                ``dtg``, or one of the ``Relative``, ``Absolute`` or
+                ``DistanceToGo`` aliases.
+            anum (int) : The axis number.
+            fmt (str) : The %-format used to format the value.
+            scale (float, optional) : Factor the value is multiplied by
+                before formatting, e.g. 2 to show a lathe diameter.
+
+        Returns:
+            DataChannel : The string channel.
+        """
+        key = (getattr(self, ref_type), anum, fmt, scale)
+        chan = self._string_channels.get(key)
+        if chan is None:
+            chan = DataChannel(doc='Formatted {} position of axis {}'.format(ref_type, anum))
+            chan.value = self._formatString(key)
+            chan.fupdate = partial(self._refreshString, key)
+            self._string_channels[key] = chan
+        return chan
+
+    def _formatString(self, key):
+        source, anum, fmt, scale = key
+        return fmt % (source.value[anum] * scale)
+
+    def _refreshString(self, key, chan):
+        chan.value = self._formatString(key)
+
+    def _updateStrings(self):
+        for key, chan in self._string_channels.items():
+            if not chan.subscribed:
+                # refreshed when read
+                continue
+            text = self._formatString(key)
+            if text != chan._value:
+                chan.setValue(text)
+
+    def axisChannel(self, ref_type, anum, deadband=None):
+        """Get a channel with the position of a single axis.
+
+        The channel is shared by all the callers that pass the same
+        arguments. It is only notified when the axis has moved more than
+        `deadband` from the last notified value.
+
+        Args:
+            ref_type (str) : The position channel, ``rel``, ``abs`` or
+                ``dtg``, or one of their aliases.
+            anum (int) : The axis number.
+            deadband (float, optional) : The change threshold, in the
+                reported units. Defaults to the ``deadband`` setting, or to
+                half the last displayed digit of the current format.
+
+        Returns:
+            DataChannel : The axis channel.
+        """
+        if deadband is None:
+            deadband = self._deadband
+
+        key = (getattr(self, ref_type), anum, deadband)
+        chan = self._axis_channels.get(key)
+        if chan is None:
+            chan = DataChannel(doc='{} position of axis {}'.format(ref_type, anum))
+            chan.value = key[0].value[anum]
+            chan.fupdate = partial(self._refreshAxis, key)
+            self._axis_channels[key] = chan
+        return chan
+
+    def _refreshAxis(self, key, chan):
+        chan.value = key[0].value[key[1]]
+
+    def _updateAxes(self):
+        for (source, anum, deadband), chan in self._axis_channels.items():
+            if not chan.subscribed:
+                # refreshed when read
+                continue
+
+            if deadband is None:
+                deadband = self._auto_deadband
+
+            value = source.value[anum]
+            old = chan._value
+            if value != old and abs(value - old) > deadband:
+                chan.setValue(value)
+
     # aliases
     Relative = rel
     Absolute = abs
@@ -231,19 +411,58 @@ class Position(DataPlugin):
 
         if self._report_actual_pos:
             # disconnect commanded pos update signals
-            STATUS.position.signal.disconnect(self._update)
+            STATUS.position.signal.disconnect(self._update_slot)
             # STATUS.joint_position.signal.disconnect(self._update)
             # connect actual pos update signals
-            STATUS.actual_position.signal.connect(self._update)
+            STATUS.actual_position.signal.connect(self._update_slot)
             # STATUS.joint_actual_position.signal.connect(self.joint._update)
         else:
             # disconnect actual pos update signals
-            STATUS.actual_position.signal.disconnect(self._update)
+            STATUS.actual_position.signal.disconnect(self._update_slot)
             # STATUS.joint_actual_position.signal.disconnect(self._update)
             # connect commanded pos update signals
-            STATUS.position.signal.connect(self._update)
+            STATUS.position.signal.connect(self._update_slot)
             # STATUS.joint_position.signal.connect(self._update)
 
+    def _invalidateTransform(self, *args):
+        self._transform = None
+
+    def _buildTransform(self):
+        g5x_offset = STAT.g5x_offset
+        g92_offset = STAT.g92_offset
+        tool_offset = STAT.tool_offset
+
+        if STAT.program_units != MACHINE_UNITS and self._use_program_units:
+            factors = CONVERSION_FACTORS
+        else:
+            factors = None
+
+        # rel = (pos - g5x_offset - tool_offset), rotated, - g92_offset,
+        # converted to program units, for the axes in the config only
+        offset = []
+        scale = []
+        g92 = []
+        for anum in range(9):
+            k = 1.0 if anum in INFO.AXIS_NUMBER_LIST else 0.0
+            if factors is not None:
+                k *= factors[anum]
+            offset.append(g5x_offset[anum] + tool_offset[anum])
+            scale.append(k)
+            g92.append(g92_offset[anum] * k)
+
+        rotation = None
+        if STAT.rotation_xy != 0:
+            t = math.radians(-STAT.rotation_xy)
+            mx, my = [1.0 if anum in INFO.AXIS_NUMBER_LIST else 0.0 for anum in (0, 1)]
+            fx, fy = factors[:2] if factors is not None else (1.0, 1.0)
+            rotation = (math.cos(t), math.sin(t), mx, my, fx, fy)
+
+        joint_factors = None
+        if factors is not None:
+            joint_factors = [factors[AXIS_LETTERS.index(letter)] for letter in MACHINE_COORDS]
+
+        self._transform = (offset, scale, g92, rotation, factors, joint_factors)
+
     def _update(self):
 
         if self._report_actual_pos:
@@ -252,29 +471,50 @@ class Position(DataPlugin):
             pos = STAT.position
 
         dtg = STAT.dtg
-        g5x_offset = STAT.g5x_offset
-        g92_offset = STAT.g92_offset
-        tool_offset = STAT.tool_offset
 
-        rel = [0] * 9
-        for axis in INFO.AXIS_NUMBER_LIST:
-            rel[axis] = pos[axis] - g5x_offset[axis] - tool_offset[axis]
+        if self._transform is None:
+            self._buildTransform()
+        offset, scale, g92, rotation, factors, joint_factors = self._transform
 
-        if STAT.rotation_xy != 0:
-            t = math.radians(-STAT.rotation_xy)
-            xr = rel[0] * math.cos(t) - rel[1] * math.sin(t)
-            yr = rel[0] * math.sin(t) + rel[1] * math.cos(t)
-            rel[0] = xr
-            rel[1] = yr
+        rel = [(p - o) * k - g for p, o, k, g in zip(pos, offset, scale, g92)]
 
-        for axis in INFO.AXIS_NUMBER_LIST:
-            rel[axis] -= g92_offset[axis]
+        if rotation is not None:
+            cos, sin, mx, my, fx, fy = rotation
+            x = (pos[0] - offset[0]) * mx
+            y = (pos[1] - offset[1]) * my
+            rel[0] = (x * cos - y * sin) * fx - g92[0]
+            rel[1] = (x * sin + y * cos) * fy - g92[1]
 
-        if STAT.program_units != MACHINE_UNITS and self._use_program_units:
-            pos = [pos[anum] * CONVERSION_FACTORS[anum] for anum in range(9)]
-            rel = [rel[anum] * CONVERSION_FACTORS[anum] for anum in range(9)]
-            dtg = [dtg[anum] * CONVERSION_FACTORS[anum] for anum in range(9)]
+        if factors is not None:
+            pos = [p * f for p, f in zip(pos, factors)]
+            dtg = [d * f for d, f in zip(dtg, factors)]
 
         self.rel.setValue(tuple(rel))
         self.abs.setValue(tuple(pos))
         self.dtg.setValue(tuple(dtg))
+
+        self._updateStrings()
+        self._updateAxes()
+
+        if self.joint.subscribed:
+            self._updateJoints()
+
+    def _updateJoints(self):
+
+        if self._report_actual_pos:
+            pos = STAT.joint_actual_position
+        else:
+            pos = STAT.joint_position
+
+        if self._transform is None:
+            self._buildTransform()
+        joint_factors = self._transform[5]
+
+        if joint_factors is not None:
+            pos = [p * f for p, f in zip(pos, joint_factors)] + list(pos[len(joint_factors):])
+
+        pos = tuple(pos)
+        if self.joint.subscribed:
+            self.joint.setValue(pos)
+        else:
+            self.joint.value = pos
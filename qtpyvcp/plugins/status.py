@@ -1,11 +1,16 @@
 import os
+import time
 import linuxcnc
 
-from qtpy.QtCore import QTimer, QFileSystemWatcher
+from functools import partial
+from operator import itemgetter
+
+from qtpy.QtCore import QObject, QThread, QTimer, QEvent, QFileSystemWatcher, Signal, Slot
 
 from qtpyvcp.utilities.logger import getLogger
 from qtpyvcp.app.runtime_config import RuntimeConfig
-from qtpyvcp.plugins import DataPlugin, DataChannel
+from qtpyvcp.plugins import DataPlugin, DataChannel, batchUpdates
+from qtpyvcp.lib.stat_diff import StatDiffer
 
 from qtpyvcp.utilities.info import Info
 
@@ -16,10 +21,49 @@ CMD = linuxcnc.command()
 
 
 class Status(DataPlugin):
+    """Status Plugin
+
+    Polls ``linuxcnc.stat`` every `cycle_time` ms and updates the data
+    channels of the items that changed.
+
+    The poll rate can optionally adapt to the machine state: faster while the
+    machine is moving or running a program, slower while it is in E-stop or
+    off, and slowest while the main window is minimized or hidden.
+
+    YAML configuration:
+
+    This goes in your config.yml file in the `data_plugins` section.
+
+    .. code-block:: yaml
+
+        data_plugins:
+          status:
+            kwargs:
+              # cycle time in ms while the machine is on and not moving
+              cycle_time: 75
+              # omit to always poll at `cycle_time`
+              adaptive_rate:
+                # while moving, jogging or running a program
+                fast_cycle_time: 25
+                # while in E-stop or machine off
+                idle_cycle_time: 500
+                # while the main window is minimized or hidden
+                hidden_cycle_time: 1000
+              # poll and detect changes in a worker thread
+              threaded: False
+
+    When `threaded` is set the worker owns its own ``linuxcnc.stat`` and the
+    changes of each cycle are delivered to the GUI thread as a single batch.
+    """
 
     stat = STAT
 
-    def __init__(self, cycle_time=100):
+    # used to pass state to the worker thread when `threaded` is set
+    _setWorkerTables = Signal(object)
+    _invalidateWorkerItem = Signal(str)
+    _setWorkerWindowHidden = Signal(bool)
+
+    def __init__(self, cycle_time=100, adaptive_rate=None, threaded=False):
         super(Status, self).__init__()
 
         self.no_force_homing = INFO.noForceHoming()
@@ -64,18 +108,34 @@ class Status(DataPlugin):
                 self.channels[item] = chan
                 setattr(self, item, chan)
 
+        # table driven change detection for the stat items. Only items
+        # with subscribers are diffed each cycle, the value of the others
+        # is refreshed when it is read.
+        self._stat_cache = {}
+        self._tables_dirty = True
+        self._differ = StatDiffer((), self.old)
+        for item in self.old:
+            chan = self.channels[item]
+            chan.fupdate = partial(self._refreshItem, item)
+            chan.subscriptionChanged.connect(self._onSubscriptionChanged)
+
         # add joint status channels
-        self.joint = tuple(JointStatus(jnum) for jnum in range(9))
+        self.joint = tuple(JointStatus(jnum, self) for jnum in range(9))
         for joint in self.joint:
             for chan, obj in joint.channels.items():
                 self.channels['joint.{}.{}'.format(joint.jnum, chan)] = obj
 
         # add spindle status channels
-        self.spindle = tuple(SpindleStatus(snum) for snum in range(8))
+        self.spindle = tuple(SpindleStatus(snum, self) for snum in range(8))
         for spindle in self.spindle:
             for chan, obj in spindle.channels.items():
                 self.channels['spindle.{}.{}'.format(spindle.snum, chan)] = obj
 
+        # channels exist for all joints and spindles so that URLs always
+        # resolve, but only the ones in the INI are updated
+        self._configured_joints = self.joint[:INFO.getNumberJoints()]
+        self._configured_spindles = self.spindle[:INFO.spindles()]
+
         self.all_axes_homed.value = False
         self.homed.notify(self.all_axes_homed.setValue)
         self.enabled.notify(self.all_axes_homed.setValue)
@@ -85,6 +145,36 @@ class Status(DataPlugin):
         self._cycle_time = cycle_time
         self.timer.timeout.connect(self._periodic)
 
+        self._window_hidden = False
+        self._adaptive_rate = None
+        if adaptive_rate:
+            self._adaptive_rate = {
+                'fast': adaptive_rate.get('fast_cycle_time', cycle_time),
+                'idle': adaptive_rate.get('idle_cycle_time', cycle_time),
+                'hidden': adaptive_rate.get('hidden_cycle_time', cycle_time),
+            }
+
+        # optional worker thread poller
+        self._thread = None
+        self._worker = None
+        self._last_poll = 0
+        if threaded:
+            self._thread = QThread()
+            self._worker = StatusPollWorker(cycle_time, self._adaptive_rate)
+            self._worker.moveToThread(self._thread)
+            self._thread.started.connect(self._worker.start)
+            self._worker.changed.connect(self._applyChanges)
+            self._setWorkerTables.connect(self._worker.setTables)
+            self._invalidateWorkerItem.connect(self._worker.invalidate)
+            self._setWorkerWindowHidden.connect(self._worker.setWindowHidden)
+
+            # getters read ``STAT`` directly, so make them sync it first
+            for chan in self.channels.values():
+                if chan.fget is not None:
+                    chan.fget = self._syncingGetter(chan.fget)
+                if chan.fstr is not None:
+                    chan.fstr = self._syncingGetter(chan.fstr)
+
         self.on.settable = True
         self.task_state.notify(lambda ts:
                                self.on.setValue(ts == linuxcnc.STATE_ON))
@@ -660,7 +750,113 @@ class Status(DataPlugin):
         data structure so as to not "break" things.
         """
         # TODO: add to this list as needed. Possible to externalise via yaml?
-        self.old['axes'] = None
+        self.forceUpdate('axes')
+
+    def forceUpdate(self, item):
+        """Force a stat item to be emitted on the next status cycle.
+
+        Args:
+            item (str) : The name of the ``linuxcnc.stat`` item.
+        """
+        if self._tables_dirty:
+            self._updateTables()
+
+        if self._worker is not None:
+            self._invalidateWorkerItem.emit(item)
+        else:
+            self._differ.invalidate(item)
+
+    def statItem(self, item):
+        """Get the value of a stat item as of the last poll.
+
+        The value is only read from ``linuxcnc.stat`` once per cycle, which
+        matters for items like ``joint`` that build a new tuple of dicts on
+        every access.
+
+        Args:
+            item (str) : The name of the ``linuxcnc.stat`` item.
+        """
+        if self._worker is not None:
+            self._syncStat()
+
+        try:
+            return self._stat_cache[item]
+        except KeyError:
+            value = self._stat_cache[item] = getattr(STAT, item)
+            return value
+
+    def _refreshItem(self, item, chan):
+        """Bring an item that has no subscribers up to date."""
+        value = self.statItem(item)
+        if value != self.old[item]:
+            self.old[item] = value
+            chan.setValue(value)
+
+    def _syncingGetter(self, func):
+        """Wrap a channel getter so it syncs ``STAT`` before reading it."""
+        def inner(*args, **kwargs):
+            self._syncStat()
+            return func(*args, **kwargs)
+        return inner
+
+    def _syncStat(self):
+        """Poll the GUI thread's stat when the worker thread is polling.
+
+        Only called when something reads ``STAT`` directly, from
+        :meth:`statItem` and the channel getters, and polls at most once per
+        cycle, so ``STAT.poll()`` is not run on the GUI thread for every
+        batch of changes the worker posts.
+        """
+        now = time.time()
+        if now - self._last_poll >= self._cycle_time / 1000.0:
+            self._last_poll = now
+            try:
+                STAT.poll()
+            except Exception:
+                return
+            self._stat_cache.clear()
+
+    def _onSubscriptionChanged(self, count):
+        if self._tables_dirty:
+            return
+        self._tables_dirty = True
+        if self._worker is not None and self._thread.isRunning():
+            # coalesce the changes made while widgets are being connected
+            QTimer.singleShot(0, self._updateTables)
+
+    def _updateTables(self):
+        """Rebuild the change tables from the items that have subscribers."""
+        if not self._tables_dirty:
+            return
+
+        active = sorted(item for item in self.old
+                        if self.channels[item].subscribed)
+        LOG.debug("Diffing %i of %i stat items", len(active), len(self.old))
+
+        # use the last seen values as the baseline, so any item that changed
+        # while it did not have subscribers is emitted on the next cycle
+        if self._worker is None:
+            self._differ.setFields(active, self.old)
+        else:
+            # copies, the worker thread must not share mutable state
+            tables = {None: (active, dict(self.old))}
+            for block in self._configured_joints + self._configured_spindles:
+                if block.active:
+                    tables[(block.item, block.index)] = block.table()
+            self._setWorkerTables.emit(tables)
+
+        self._tables_dirty = False
+
+    def _applyChanges(self, batch):
+        """Apply a batch of changes posted by the worker thread."""
+        changes, block_changes = batch
+        with batchUpdates():
+            for item, new_val in changes:
+                self.old[item] = new_val
+                self.channels[item].setValue(new_val)
+
+            for item, index, changed in block_changes:
+                getattr(self, item)[index]._apply(changed)
 
     def initialise(self):
         """Start the periodic update timer."""
@@ -673,13 +869,44 @@ class Status(DataPlugin):
 
         LOG.debug("Starting periodic updates with %ims cycle time",
                   self._cycle_time)
-        self.timer.start(self._cycle_time)
+        if self._worker is not None:
+            self._updateTables()
+            self._thread.start()
+        else:
+            self.timer.start(self._cycle_time)
 
         self.forceUpdateStaticChannelMembers()
 
+    def postGuiInitialise(self, main_window):
+        """Track the main window visibility for the adaptive poll rate."""
+        if self._adaptive_rate is not None:
+            main_window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.WindowStateChange, QEvent.Show, QEvent.Hide):
+            hidden = obj.isMinimized() or not obj.isVisible()
+            if hidden != self._window_hidden:
+                self._window_hidden = hidden
+                if self._worker is not None:
+                    self._setWorkerWindowHidden.emit(hidden)
+        return False
+
+    def cycleTime(self):
+        """Get the cycle time appropriate for the current machine state.
+
+        Returns:
+            int : The cycle time in ms.
+        """
+        return adaptiveCycleTime(STAT, self._cycle_time, self._adaptive_rate,
+                                 self._window_hidden)
+
     def terminate(self):
         """Save persistent data on terminate."""
 
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+
         # save recent files
         with RuntimeConfig('~/.axis_preferences') as rc:
             rc.set('DEFAULT', 'recentfiles', self.recent_files.value)
@@ -698,67 +925,235 @@ class Status(DataPlugin):
             self.timer.stop()
             return
 
-        # status updates
-        for item, old_val in self.old.iteritems():
-            new_val = getattr(STAT, item)
-            if new_val != old_val:
+        self._stat_cache.clear()
+
+        if self._tables_dirty:
+            self._updateTables()
+
+        # listeners are notified once the whole cycle has been processed
+        with batchUpdates():
+
+            # status updates
+            for item, new_val in self._differ.diff(STAT):
                 self.old[item] = new_val
                 self.channels[item].setValue(new_val)
 
-        # joint status updates
-        for joint in self.joint:
-            joint._update()
+            # joint status updates, only for configured joints with subscribers
+            for joint in self._configured_joints:
+                if joint.active:
+                    joint._update()
 
-        # spindle status updates
-        for spindle in self.spindle:
-            spindle._update()
+            # spindle status updates, only for configured spindles with subscribers
+            for spindle in self._configured_spindles:
+                if spindle.active:
+                    spindle._update()
+
+        if self._adaptive_rate is not None:
+            cycle_time = self.cycleTime()
+            if cycle_time != self.timer.interval():
+                LOG.debug("Changing cycle time to %ims", cycle_time)
+                self.timer.setInterval(cycle_time)
 
         # print time.time() - s
 
 
-class JointStatus(DataPlugin):
-    def __init__(self, jnum):
-        super(JointStatus, self).__init__()
+def adaptiveCycleTime(stat, cycle_time, rate, hidden=False):
+    """Get the cycle time appropriate for the machine state.
 
-        self.jnum = jnum
-        self.jstat = STAT.joint[jnum]
+    Args:
+        stat (linuxcnc.stat) : A polled stat object.
+        cycle_time (int) : The normal cycle time in ms.
+        rate (dict) : The adaptive rate cycle times, or None.
+        hidden (bool) : Whether the main window is minimized or hidden.
 
-        for key, value in self.jstat.items():
-            chan = DataChannel(doc=key, data=value)
-            self.channels[key] = chan
-            setattr(self, key, chan)
+    Returns:
+        int : The cycle time in ms.
+    """
+    if rate is None:
+        return cycle_time
 
-    def _update(self):
-        """Periodic joint item updates."""
+    if hidden:
+        return rate['hidden']
 
-        jstat = STAT.joint[self.jnum].items()
-        changed_items = tuple(set(jstat) - set(self.jstat.items()))
-        for item in changed_items:
-            LOG.debug('JOINT_{0} {1}: {2}'.format(self.jnum, item[0], item[1]))
-            self.channels[item[0]].setValue(item[1])
+    if stat.task_state != linuxcnc.STATE_ON:
+        return rate['idle']
 
-        self.jstat.update(jstat)
+    if stat.interp_state != linuxcnc.INTERP_IDLE \
+            or stat.current_vel > 0 or not stat.inpos:
+        return rate['fast']
 
+    return cycle_time
 
-class SpindleStatus(DataPlugin):
-    def __init__(self, snum):
-        super(SpindleStatus, self).__init__()
 
-        self.snum = snum
-        self.sstat = STAT.spindle[snum]
+class StatusPollWorker(QObject):
+    """Polls ``linuxcnc.stat`` and detects changes in a worker thread.
+
+    The worker owns its own ``linuxcnc.stat`` instance, and the changes
+    found each cycle are posted to the GUI thread as a single batch through
+    the queued ``changed`` signal. The batch is a ``(changes, block_changes)``
+    tuple, where `changes` is a list of ``(item, value)`` and `block_changes`
+    is a list of ``(item, index, [(key, value), ...])`` for joints and
+    spindles.
+
+    Args:
+        cycle_time (int) : The normal cycle time in ms.
+        rate (dict) : The adaptive rate cycle times, or None.
+    """
+
+    changed = Signal(object)
+
+    def __init__(self, cycle_time, rate=None):
+        super(StatusPollWorker, self).__init__()
+
+        self._cycle_time = cycle_time
+        self._rate = rate
+        self._hidden = False
+
+        self._stat = None
+        self._timer = None
+
+        self._differ = StatDiffer((), {})
+        self._blocks = {}
+
+    @Slot()
+    def start(self):
+        """Start polling, called in the worker thread."""
+        self._stat = linuxcnc.stat()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._poll)
+        self._timer.start(self._cycle_time)
+
+    @Slot(object)
+    def setTables(self, tables):
+        """Set the items, joint and spindle keys to detect changes in.
+
+        Args:
+            tables (dict) : ``(fields, baseline_values)`` for the stat items
+                under the ``None`` key, and for each joint or spindle under a
+                ``(item, index)`` key.
+        """
+        tables = dict(tables)
+        self._differ.setFields(*tables.pop(None))
+        self._blocks = {key: StatDiffer(fields, values, itemgetter)
+                        for key, (fields, values) in tables.items()}
+
+    @Slot(str)
+    def invalidate(self, item):
+        self._differ.invalidate(str(item))
+
+    @Slot(bool)
+    def setWindowHidden(self, hidden):
+        self._hidden = hidden
+
+    def _poll(self):
+        stat = self._stat
+        try:
+            stat.poll()
+        except Exception:
+            LOG.warning("Status polling failed, is LinuxCNC running?", exc_info=True)
+            self._timer.stop()
+            return
 
-        for key, value in self.sstat.items():
+        changes = self._differ.diff(stat)
+
+        block_changes = []
+        items = {}
+        for (item, index), differ in self._blocks.items():
+            if item not in items:
+                items[item] = getattr(stat, item)
+            changed = differ.diff(items[item][index])
+            if changed:
+                block_changes.append((item, index, changed))
+
+        if changes or block_changes:
+            self.changed.emit((changes, block_changes))
+
+        if self._rate is not None:
+            cycle_time = adaptiveCycleTime(stat, self._cycle_time,
+                                           self._rate, self._hidden)
+            if cycle_time != self._timer.interval():
+                self._timer.setInterval(cycle_time)
+
+
+class StatBlockStatus(DataPlugin):
+    """Base for the per-joint and per-spindle status plugins.
+
+    Each block tracks one entry of a ``linuxcnc.stat`` item that is a tuple
+    of dicts (``joint`` or ``spindle``). Only keys with subscribers are
+    compared, using a :class:`.StatDiffer` built on ``operator.itemgetter``
+    so the comparison is done in bulk against the previous snapshot.
+
+    Args:
+        item (str) : The stat item, ``joint`` or ``spindle``.
+        index (int) : The index of the entry in the stat item.
+        status (Status) : The status plugin, used to get the cached stat item.
+    """
+    def __init__(self, item, index, status):
+        super(StatBlockStatus, self).__init__()
+
+        self.item = item
+        self.index = index
+        self._status = status
+
+        self._values = getattr(STAT, item)[index]
+        self._differ = StatDiffer((), self._values, itemgetter)
+
+        for key, value in self._values.items():
             chan = DataChannel(doc=key, data=value)
+            chan.fupdate = partial(self._refreshItem, key)
+            chan.subscriptionChanged.connect(self._onSubscriptionChanged)
             self.channels[key] = chan
             setattr(self, key, chan)
 
+    @property
+    def active(self):
+        """bool : True if any of the block's channels have subscribers."""
+        return len(self._differ.fields) > 0
+
+    def table(self):
+        """Get the subscribed keys and their last seen values.
+
+        Returns:
+            tuple : (keys, values)
+        """
+        return self._differ.fields, dict(self._values)
+
+    def _onSubscriptionChanged(self, count):
+        active = sorted(key for key, chan in self.channels.items()
+                        if chan.subscribed)
+        self._differ.setFields(active, self._values)
+        self._status._onSubscriptionChanged(count)
+
+    def _refreshItem(self, key, chan):
+        """Bring an item that has no subscribers up to date."""
+        value = self._status.statItem(self.item)[self.index][key]
+        if value != self._values[key]:
+            self._values[key] = value
+            chan.setValue(value)
+
     def _update(self):
-        """Periodic spindle item updates."""
+        """Periodic item updates."""
+        values = self._status.statItem(self.item)[self.index]
+        self._apply(self._differ.diff(values))
+
+    def _apply(self, changes):
+        for key, value in changes:
+            LOG.debug('%s_%i %s: %s', self.item.upper(), self.index, key, value)
+            self._values[key] = value
+            self.channels[key].setValue(value)
+
 
-        sstat = STAT.spindle[self.snum].items()
-        changed_items = tuple(set(sstat) - set(self.sstat.items()))
-        for item in changed_items:
-            LOG.debug('Spindle_{0} {1}: {2}'.format(self.snum, item[0], item[1]))
-            self.channels[item[0]].setValue(item[1])
+class JointStatus(StatBlockStatus):
+    def __init__(self, jnum, status):
+        super(JointStatus, self).__init__('joint', jnum, status)
 
-        self.sstat.update(sstat)
+        self.jnum = jnum
+        self.jstat = self._values
+
+
+class SpindleStatus(StatBlockStatus):
+    def __init__(self, snum, status):
+        super(SpindleStatus, self).__init__('spindle', snum, status)
+
+        self.snum = snum
+        self.sstat = self._values
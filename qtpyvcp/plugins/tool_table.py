@@ -73,6 +73,15 @@ DEFAULT_TOOL = {
 
 NO_TOOL = merge(DEFAULT_TOOL, {'T': 0, 'R': 'No Tool Loaded'})
 
+# the tool data columns, in the order of the fields of a tool record
+TOOL_FIELDS = 'TPXYZABCUVWDIJQR'
+
+_FIELD_INDEX = {field: index for index, field in enumerate(TOOL_FIELDS)}
+_DEFAULT_RECORD = tuple(DEFAULT_TOOL[field] for field in TOOL_FIELDS)
+_NO_TOOL_RECORD = tuple(NO_TOOL[field] for field in TOOL_FIELDS)
+
+_ITEM_RE = re.compile(r"([A-Z]+[0-9.+-]+)")
+
 # FILE_HEADER = """
 # LinuxCNC Tool Table
 # -------------------
@@ -109,6 +118,86 @@ FLOAT_COLUMN_WIDTH = 12
 FLOAT_DECIMAL_PLACES = 6
 
 
+def parseToolLine(line):
+    """Parse a tool table line.
+
+    Args:
+        line (str) : The stripped line.
+
+    Returns:
+        tuple : The tool record, with the values in the order of
+            ``TOOL_FIELDS``, or None if the line does not define a tool.
+    """
+    data, sep, comment = line.partition(';')
+
+    values = list(_DEFAULT_RECORD)
+    for item in _ITEM_RE.findall(data.replace(' ', '')):
+        descriptor = item[0]
+        index = _FIELD_INDEX.get(descriptor)
+        if index is None:
+            continue
+
+        value = item[1:]
+        if descriptor in ('T', 'P', 'Q'):
+            try:
+                values[index] = int(value)
+            except ValueError:
+                LOG.error('Error converting value to int: {}'.format(value))
+                break
+        else:
+            try:
+                values[index] = float(value)
+            except ValueError:
+                LOG.error('Error converting value to float: {}'.format(value))
+                break
+
+    values[_FIELD_INDEX['R']] = comment.strip()
+
+    if values[_FIELD_INDEX['T']] == -1:
+        return None
+
+    return tuple(values)
+
+
+def parseToolTable(lines):
+    """Parse the lines of a tool table file in a single pass.
+
+    Everything up to and including the last line starting with a semicolon
+    is the file header, the lines after it hold the tools.
+
+    Args:
+        lines (iterable) : The lines of the tool table file.
+
+    Returns:
+        tuple : ``(header_lines, records)``, where `header_lines` are the
+            stripped header lines, or None if the file has no header, and
+            `records` is a dict of tool number to tool record, see
+            :func:`parseToolLine`.
+    """
+    header = None
+    pending = []
+    records = {}
+
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith(';'):
+            # the lines so far were all part of the header
+            header = (header or []) + pending
+            header.append(line)
+            pending = []
+            records = {}
+            continue
+
+        pending.append(line)
+
+        record = parseToolLine(line)
+        if record is not None:
+            records[record[0]] = record
+
+    return header, records
+
+
 def makeLorumIpsumToolTable():
     return {i: merge(DEFAULT_TOOL,
                      {'T': i, 'P': i, 'R': 'Lorum Ipsum ' + str(i)})
@@ -116,6 +205,12 @@ def makeLorumIpsumToolTable():
 
 
 class ToolTable(DataPlugin):
+    """Tool table data plugin.
+
+    The ``tool_table_changed`` signal is emitted with a dict of only the
+    tools that changed since the last load, mapping the tool number to the
+    new tool data, or to None if the tool was removed.
+    """
 
     TOOL_TABLE = {0: NO_TOOL}
     DEFAULT_TOOL = DEFAULT_TOOL
@@ -129,6 +224,12 @@ class ToolTable(DataPlugin):
 
         self.fs_watcher = None
         self.orig_header_lines = []
+
+        # the parsed records of the loaded tools, used to find the changes
+        self._records = {}
+        # (path, mtime, size, inode) of the loaded file
+        self._file_stat = None
+
         self.file_header_template = file_header_template or ''
         self.remember_tool_in_spindle = remember_tool_in_spindle
         self.columns = self.validateColumns(columns) or [c for c in 'TPXYZABCUVWDIJQR']
@@ -246,9 +347,8 @@ class ToolTable(DataPlugin):
         if self.tool_table_file not in self.fs_watcher.files():
             self.fs_watcher.addPath(self.tool_table_file)
 
-        # reload with the new data
-        tool_table = self.loadToolTable()
-        self.tool_table_changed.emit(tool_table)
+        # reload with the new data, emits tool_table_changed if needed
+        self.loadToolTable()
 
     def iterTools(self, tool_table=None, columns=None):
         tool_table = tool_table or self.TOOL_TABLE
@@ -257,7 +357,20 @@ class ToolTable(DataPlugin):
             tool_data = tool_table[tool]
             yield [tool_data[key] for key in columns]
 
-    def loadToolTable(self, tool_file=None):
+    def loadToolTable(self, tool_file=None, force=False):
+        """Load the tool table file.
+
+        The file is only parsed if it changed since the last load, and
+        ``tool_table_changed`` is only emitted with the tools that changed.
+
+        Args:
+            tool_file (str) : Path of the tool table file to load.
+                Defaults to ``self.tool_table_file``.
+            force (bool) : Parse the file even if it has not changed.
+
+        Returns:
+            dict : A copy of the tool table.
+        """
 
         if tool_file is None:
             tool_file = self.tool_table_file
@@ -270,68 +383,57 @@ class ToolTable(DataPlugin):
             LOG.critical("Tool table file does not exist: {}".format(tool_file))
             return {}
 
+        st = os.stat(tool_file)
+        file_stat = (tool_file, st.st_mtime, st.st_size, st.st_ino)
+        if file_stat == self._file_stat and not force:
+            LOG.debug("Tool table file has not changed: {}".format(tool_file))
+            return self.TOOL_TABLE.copy()
+
         with open(tool_file, 'r') as fh:
-            lines = [line.strip() for line in fh.readlines()]
-
-        # find opening colon, and get header data so it can be restored
-        for rlnum, line in enumerate(reversed(lines)):
-            if line.startswith(';'):
-                lnum = len(lines) - rlnum
-                raw_header = lines[:lnum]
-                lines = lines[lnum:]
-
-                self.orig_header_lines = list(takewhile(lambda l:
-                                        not l.strip() == '---' and
-                                        not l.startswith(';Tool'), raw_header))
-                break
+            raw_header, records = parseToolTable(fh)
 
-        table = {0: NO_TOOL,}
-        for line in lines:
-
-            data, sep, comment = line.partition(';')
-            items = re.findall(r"([A-Z]+[0-9.+-]+)", data.replace(' ', ''))
-
-            tool = DEFAULT_TOOL.copy()
-            for item in items:
-                descriptor = item[0]
-                if descriptor in 'TPXYZABCUVWDIJQR':
-                    value = item[1:]
-                    if descriptor in ('T', 'P', 'Q'):
-
-                        try:
-                            tool[descriptor] = int(value)
-                        except:
-                            LOG.error('Error converting value to int: {}'.format(value))
-                            break
-                    else:
-                        try:
-                            tool[descriptor] = float(value)
-                        except:
-                            LOG.error('Error converting value to float: {}'.format(value))
-                            break
-
-            tool['R'] = comment.strip()
-
-            tnum = tool['T']
-            if tnum == -1:
-                continue
+        self._file_stat = file_stat
 
-            # add the tool to the table
-            table[tnum] = tool
+        # get header data so it can be restored
+        if raw_header is not None:
+            self.orig_header_lines = list(takewhile(lambda l:
+                                    not l.strip() == '---' and
+                                    not l.startswith(';Tool'), raw_header))
+
+        if 0 not in records:
+            records[0] = _NO_TOOL_RECORD
+
+        # only create new dicts for the tools that changed
+        old_records = self._records
+        old_table = self.TOOL_TABLE
+
+        table = {}
+        changes = {}
+        for tnum, record in records.items():
+            if old_records.get(tnum) == record and tnum in old_table:
+                table[tnum] = old_table[tnum]
+            else:
+                table[tnum] = changes[tnum] = dict(zip(TOOL_FIELDS, record))
+
+        for tnum in old_records:
+            if tnum not in records:
+                changes[tnum] = None
 
         # update tooltable
+        self._records = records
         self.__class__.TOOL_TABLE = table
 
-        self.current_tool.setValue(self.TOOL_TABLE[STATUS.tool_in_spindle.getValue()])
-
-        # import json
-        # print json.dumps(table, sort_keys=True, indent=4)
+        if changes:
+            LOG.debug("Tool table changed, {} tool(s) updated".format(len(changes)))
+            self.current_tool.setValue(self.TOOL_TABLE[STATUS.tool_in_spindle.getValue()])
+            self.tool_table_changed.emit(changes)
 
-        self.tool_table_changed.emit(table)
         return table.copy()
 
     def getToolTable(self):
-        return self.TOOL_TABLE.copy()
+        """Returns a copy of the tool table, the tool dicts are copied too so
+        they can be edited without changing the loaded tool table."""
+        return {tnum: tool.copy() for tnum, tool in self.TOOL_TABLE.items()}
 
     def saveToolTable(self, tool_table, columns=None, tool_file=None):
         """Write tooltable data to file.
@@ -35,6 +35,10 @@ Application Options:
   --qt-api (pyqt5 | pyqt | pyside2 | pyside)
                        Specify the Qt Python binding to use.
   --perfmon            Monitor and log system performance.
+  --profile-startup PATH
+                       Write a JSON report of the time spent loading
+                       plugins, windows and widgets to PATH, relative to
+                       $CONFIG_DIR, and a Chrome trace next to it.
   --develop            Development mode. Enables live reloading of QSS styles.
   --command_line_args <args>...
                        Additional args passed to the QtApplication.
@@ -198,6 +202,13 @@ def apply_opts(opts):
 
     LOG.info("QtPyVCP Version: %s", QTPYVCP_VERSION)
 
+    # start profiling before the VCP and its plugins are imported
+    if opts.profile_startup:
+        from qtpyvcp.utilities import profiler
+        profiler.enable(normalizePath(opts.profile_startup,
+                                      os.getenv('CONFIG_DIR') or
+                                      os.getenv('HOME')))
+
     if LOG.getEffectiveLevel() == logger.logLevelFromName("DEBUG"):
         import qtpy
         LOG.debug("Qt Version: %s", qtpy.QT_VERSION)
@@ -0,0 +1,287 @@
+"""Startup Profiler
+
+Records how long the steps of loading a VCP take, such as importing,
+creating and initialising each data plugin, loading each window's .ui file,
+registering widget rules and initialising each widget.
+
+Profiling is enabled with the ``--profile-startup PATH`` command line option.
+Once the application's event loop is running a JSON report is written to
+``PATH``, and the same timings in Chrome trace event format to
+``<PATH without extension>.trace.json``, which can be opened with
+``chrome://tracing`` or https://ui.perfetto.dev.
+
+When profiling is not enabled :func:`span` returns a shared no-op context
+manager, so instrumented code costs little more than a function call.
+
+Example:
+
+    .. code-block:: python
+
+        from qtpyvcp.utilities import profiler
+
+        with profiler.span('my_plugin', 'plugin.init'):
+            inst = MyPlugin()
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+
+from qtpyvcp.utilities.logger import getLogger
+
+LOG = getLogger(__name__)
+
+# number of spans of each category to include in the report, the rest are
+# only included in the trace
+REPORT_MAX_SPANS = 50
+
+_START_TIME = time.time()
+_LAST_CHECKPOINT = [_START_TIME]
+
+_enabled = False
+_report_file = None
+_spans = []
+_marks = []
+_original_import = None
+
+
+class _Span(object):
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _spans.append((self.name, self.category, self.start, time.time(),
+                       threading.current_thread().ident, self.args))
+        return False
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def isEnabled():
+    """Returns True if startup profiling is enabled."""
+    return _enabled
+
+
+def enable(report_file):
+    """Enable startup profiling.
+
+    Args:
+        report_file (str) : Path to write the JSON report to when
+            :func:`finish` is called.
+    """
+    global _enabled, _report_file
+
+    if _enabled:
+        return
+
+    _enabled = True
+    _report_file = report_file
+    _installImportHook()
+
+    LOG.info("Startup profiling enabled, report file: yellow<{}>".format(report_file))
+
+
+def span(name, category, **args):
+    """Time a block of code.
+
+    Args:
+        name (str) : The name of the span, e.g. the plugin ID or widget name.
+        category (str) : The kind of step being timed, e.g. ``plugin.init``.
+        **args : Extra info to include in the report and trace.
+
+    Returns:
+        A context manager timing the ``with`` block it is used in.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def checkpoint(task):
+    """Log the time since startup and since the last checkpoint.
+
+    The checkpoint is also recorded as an instant event when profiling.
+
+    Args:
+        task (str) : Description of the task that was just completed.
+    """
+    now = time.time()
+    LOG.debug("yellow<Time:> {:.3f} (green<{:+.3f}>) - {}"
+              .format(now - _START_TIME, now - _LAST_CHECKPOINT[0], task))
+    _LAST_CHECKPOINT[0] = now
+
+    if _enabled:
+        _marks.append((task, now, threading.current_thread().ident))
+
+
+def finish():
+    """Stop profiling and write the report and trace files.
+
+    Does nothing if profiling is not enabled.
+    """
+    global _enabled
+
+    if not _enabled:
+        return
+
+    checkpoint('startup complete')
+
+    _enabled = False
+    _uninstallImportHook()
+
+    trace_file = os.path.splitext(_report_file)[0] + '.trace.json'
+    try:
+        with open(_report_file, 'w') as fh:
+            json.dump(report(), fh, indent=2)
+        with open(trace_file, 'w') as fh:
+            json.dump(trace(), fh)
+    except (IOError, OSError):
+        LOG.exception("Failed to write startup profile")
+        return
+
+    LOG.info("Startup profile written to yellow<{}> and yellow<{}>"
+             .format(_report_file, trace_file))
+
+
+def _selfTimes():
+    """Returns the time spent in each span excluding nested spans on the
+    same thread, in the order of `_spans`."""
+    self_times = [end - start for name, cat, start, end, tid, args in _spans]
+
+    by_thread = {}
+    for index, item in enumerate(_spans):
+        by_thread.setdefault(item[4], []).append(index)
+
+    for indexes in by_thread.values():
+        # parents start before, and end after, their children
+        indexes.sort(key=lambda i: (_spans[i][2], -_spans[i][3]))
+        stack = []
+        for index in indexes:
+            start, end = _spans[index][2:4]
+            while stack and _spans[stack[-1]][3] <= start:
+                stack.pop()
+            if stack:
+                self_times[stack[-1]] -= end - start
+            stack.append(index)
+
+    return self_times
+
+
+def report():
+    """Summarise the recorded spans.
+
+    Returns:
+        dict : The total startup time, the checkpoints and, for each
+            category, the number of spans, their total time and the
+            slowest spans. Times are in seconds, start times relative to
+            the start of the process.
+    """
+    categories = {}
+    for item, self_time in zip(_spans, _selfTimes()):
+        name, category, start, end, tid, args = item
+        summary = categories.setdefault(category, {'count': 0,
+                                                   'total_time': 0.0,
+                                                   'self_time': 0.0,
+                                                   'spans': []})
+        summary['count'] += 1
+        summary['total_time'] += end - start
+        summary['self_time'] += self_time
+        summary['spans'].append({'name': name,
+                                 'start': start - _START_TIME,
+                                 'duration': end - start,
+                                 'self_time': self_time,
+                                 'args': args})
+
+    for summary in categories.values():
+        summary['spans'].sort(key=lambda s: s['duration'], reverse=True)
+        del summary['spans'][REPORT_MAX_SPANS:]
+
+    checkpoints = [{'name': name, 'time': timestamp - _START_TIME}
+                   for name, timestamp, tid in _marks]
+
+    return {'start_time': _START_TIME,
+            'total_time': _LAST_CHECKPOINT[0] - _START_TIME,
+            'checkpoints': checkpoints,
+            'categories': categories}
+
+
+def trace():
+    """Convert the recorded spans to the Chrome trace event format.
+
+    Returns:
+        dict : The trace, with timestamps in microseconds.
+    """
+    pid = os.getpid()
+
+    events = []
+    for name, category, start, end, tid, args in _spans:
+        events.append({'name': name,
+                       'cat': category,
+                       'ph': 'X',
+                       'ts': (start - _START_TIME) * 1e6,
+                       'dur': (end - start) * 1e6,
+                       'pid': pid,
+                       'tid': tid,
+                       'args': args})
+
+    for name, timestamp, tid in _marks:
+        events.append({'name': name,
+                       'cat': 'checkpoint',
+                       'ph': 'i',
+                       's': 'g',
+                       'ts': (timestamp - _START_TIME) * 1e6,
+                       'pid': pid,
+                       'tid': tid})
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def _timedImport(name, *args, **kwargs):
+    module_count = len(sys.modules)
+    start = time.time()
+    module = _original_import(name, *args, **kwargs)
+    if len(sys.modules) != module_count:
+        # only record imports that actually loaded modules
+        _spans.append((name, 'import', start, time.time(),
+                       threading.current_thread().ident, {}))
+    return module
+
+
+def _installImportHook():
+    global _original_import
+    if _original_import is None:
+        _original_import = builtins.__import__
+        builtins.__import__ = _timedImport
+
+
+def _uninstallImportHook():
+    global _original_import
+    if _original_import is not None:
+        builtins.__import__ = _original_import
+        _original_import = None
@@ -0,0 +1,260 @@
+"""Compiled UI Cache
+
+Loading a window with ``uic.loadUi`` parses the .ui XML and creates every
+widget through reflection each time the VCP is launched, which takes a large
+part of the startup time of big VCPs. :func:`loadUi` instead compiles the
+.ui file to Python, the same as ``pyuic5`` and ``qcompile`` do, and stores
+the byte code in a cache directory keyed by a hash of the .ui file content,
+its location and the Python and PyQt versions. The location is part of the
+key because the compiled code refers to pixmaps and icons by absolute path.
+Later launches run the cached byte code, and only recompile when the .ui
+file has changed or moved.
+
+The cache is stored in ``~/.cache/qtpyvcp/ui`` by default. It can be moved
+or disabled in the INI file::
+
+    [DISPLAY]
+    UI_CACHE = false
+    UI_CACHE_DIR = ~/.cache/my_vcp
+
+If the .ui file can not be compiled, e.g. when the Qt binding has no UI
+compiler, the file is loaded with ``uic.loadUi`` as before.
+"""
+
+import os
+import re
+import sys
+import marshal
+import hashlib
+import tempfile
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from qtpy import uic, PYQT_VERSION
+
+from qtpyvcp.utilities.info import Info
+from qtpyvcp.utilities.logger import getLogger
+
+LOG = getLogger(__name__)
+INFO = Info()
+
+# bump when the format of the cache entries changes
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.getenv('XDG_CACHE_HOME') or '~/.cache',
+                                 'qtpyvcp', 'ui')
+
+# imports of the Python modules generated from the .qrc files used in the
+# .ui file, ``uic.loadUi`` does not import them either
+_RESOURCE_IMPORT_RE = re.compile(r'^import \w+_rc$', re.MULTILINE)
+
+_UI_CACHE = []
+
+
+class UiCache(object):
+    """Cache of compiled .ui files.
+
+    Args:
+        cache_dir (str) : The directory to store the compiled files in.
+        max_entries (int, optional) : The number of compiled files to keep,
+            the least recently used files are removed first.
+    """
+
+    def __init__(self, cache_dir, max_entries=50):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+        # compiled form classes, by key
+        self._classes = {}
+
+    def key(self, ui_file):
+        """Returns the cache key for `ui_file`."""
+        hasher = hashlib.sha1()
+        ui_dir = os.path.abspath(os.path.dirname(ui_file))
+        hasher.update(repr((CACHE_VERSION, ui_dir, sys.version,
+                            PYQT_VERSION)).encode('utf-8'))
+        with open(ui_file, 'rb') as fh:
+            hasher.update(fh.read())
+        return hasher.hexdigest()
+
+    def loadUiType(self, ui_file):
+        """Get the form class generated from a .ui file.
+
+        The class is loaded from the cache if present, otherwise the .ui
+        file is compiled and the result added to the cache.
+
+        Args:
+            ui_file (str) : Path to the .ui file.
+
+        Returns:
+            The ``Ui_<name>`` form class, or None if the .ui file could not
+            be compiled.
+        """
+        key = self.key(ui_file)
+        if key in self._classes:
+            return self._classes[key]
+
+        code = self._loadCode(key, ui_file)
+        if code is None:
+            code = self._compile(ui_file)
+            if code is None:
+                return None
+            self._saveCode(key, code)
+
+        # runs the imports of the custom widget classes
+        namespace = {'__name__': 'qtpyvcp.ui_cache.' + key}
+        try:
+            exec(code, namespace)
+        except Exception:
+            LOG.warning("Failed to load compiled UI file: {}".format(ui_file),
+                        exc_info=True)
+            return None
+
+        for name, obj in namespace.items():
+            if name.startswith('Ui_') and hasattr(obj, 'setupUi'):
+                self._classes[key] = obj
+                return obj
+
+        return None
+
+    def loadUi(self, ui_file, baseinstance):
+        """Set up `baseinstance` from the compiled form of a .ui file.
+
+        As with ``uic.loadUi`` the widgets defined in the .ui file are
+        added to `baseinstance` as attributes named after the widgets.
+
+        Args:
+            ui_file (str) : Path to the .ui file.
+            baseinstance (QWidget) : The widget to set up, must be of the
+                class of the top level widget in the .ui file.
+
+        Returns:
+            bool : True if the compiled form was used, False if the .ui
+                file could not be compiled.
+        """
+        form_class = self.loadUiType(ui_file)
+        if form_class is None:
+            return False
+
+        form = form_class()
+        form.setupUi(baseinstance)
+        for name, value in vars(form).items():
+            setattr(baseinstance, name, value)
+
+        return True
+
+    def _entryPath(self, key):
+        return os.path.join(self.cache_dir, key + '.bin')
+
+    def _compile(self, ui_file):
+        if not hasattr(uic, 'compileUi'):
+            return None
+
+        source = StringIO()
+        try:
+            uic.compileUi(ui_file, source)
+            return compile(_RESOURCE_IMPORT_RE.sub('', source.getvalue()),
+                           ui_file, 'exec')
+        except Exception:
+            LOG.warning("Failed to compile UI file: {}".format(ui_file),
+                        exc_info=True)
+            return None
+
+    def _loadCode(self, key, ui_file):
+        entry_path = self._entryPath(key)
+        if not os.path.isfile(entry_path):
+            return None
+
+        try:
+            with open(entry_path, 'rb') as fh:
+                code = marshal.load(fh)
+            # mark as recently used
+            os.utime(entry_path, None)
+        except Exception:
+            LOG.warning("Failed to load UI cache entry: {}".format(entry_path),
+                        exc_info=True)
+            return None
+
+        LOG.debug("Loading compiled UI file from cache: {}".format(ui_file))
+        return code
+
+    def _saveCode(self, key, code):
+        entry_path = self._entryPath(key)
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+
+            fd, temp_path = tempfile.mkstemp(prefix='.' + key, dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, 'wb') as fh:
+                    marshal.dump(code, fh)
+                os.rename(temp_path, entry_path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+
+        except Exception:
+            LOG.warning("Failed to save UI cache entry: {}".format(entry_path),
+                        exc_info=True)
+            return
+
+        self.prune()
+
+    def prune(self):
+        """Remove the least recently used entries over `max_entries`."""
+        try:
+            entries = [os.path.join(self.cache_dir, name)
+                       for name in os.listdir(self.cache_dir)
+                       if name.endswith('.bin') and not name.startswith('.')]
+        except OSError:
+            return
+
+        # entries may be removed by another process while we look at them
+        mtimes = []
+        for entry in entries:
+            try:
+                mtimes.append((os.path.getmtime(entry), entry))
+            except OSError:
+                continue
+
+        mtimes.sort(reverse=True)
+        entries = [entry for mtime, entry in mtimes]
+
+        for entry_path in entries[self.max_entries:]:
+            LOG.debug("Removing UI cache entry: {}".format(entry_path))
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
+
+
+def getUiCache():
+    """Returns the UI cache configured in the INI file, or None if the
+    cache is disabled."""
+    if not _UI_CACHE:
+        temp = INFO.ini.find("DISPLAY", "UI_CACHE") or "true"
+        if temp.lower() in ["0", "false", "no"]:
+            _UI_CACHE.append(None)
+        else:
+            temp = INFO.ini.find("DISPLAY", "UI_CACHE_DIR") or DEFAULT_CACHE_DIR
+            cache_dir = os.path.join(INFO.CONFIG_DIR, os.path.expanduser(temp))
+            _UI_CACHE.append(UiCache(cache_dir))
+    return _UI_CACHE[0]
+
+
+def loadUi(ui_file, baseinstance):
+    """Load a .ui file into `baseinstance`, using the compiled UI cache.
+
+    Falls back to ``uic.loadUi`` if the cache is disabled or the .ui file
+    can not be compiled.
+
+    Args:
+        ui_file (str) : Path to the .ui file to load.
+        baseinstance (QWidget) : The widget to set up.
+    """
+    ui_cache = getUiCache()
+    if ui_cache is None or not ui_cache.loadUi(ui_file, baseinstance):
+        uic.loadUi(ui_file, baseinstance)
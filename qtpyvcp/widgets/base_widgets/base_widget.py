@@ -7,16 +7,24 @@ all other QtPyVCP widgets are based.
 """
 
 import os
+import ast
 import json
 
 from qtpy.QtCore import Property, Slot
 from qtpy.QtWidgets import QPushButton
 
-from qtpyvcp.plugins import getPlugin
+from qtpyvcp.plugins import getPlugin, coalesced
+from qtpyvcp.utilities import profiler
 from qtpyvcp.utilities.logger import getLogger
 
 LOG = getLogger(__name__)
 
+# compiled rule expressions, shared by all widgets
+_RULE_CODE_CACHE = {}
+# channel indexes read by rule expressions, see channelsRead()
+_RULE_READS_CACHE = {}
+
+
 class ChanList(list):
     """Channel value list.
 
@@ -28,6 +36,157 @@ class ChanList(list):
         return super(ChanList, self).__getitem__(index)()
 
 
+class CachedChanList(ChanList):
+    """Channel value list that fetches each value only once per evaluation.
+
+    Call :meth:`clearCache` before each evaluation of the rule expression.
+    """
+    def __init__(self, *args):
+        super(CachedChanList, self).__init__(*args)
+        self._cache = {}
+
+    def clearCache(self):
+        self._cache.clear()
+
+    def __getitem__(self, index):
+        if not isinstance(index, int):
+            return super(CachedChanList, self).__getitem__(index)
+        try:
+            return self._cache[index]
+        except KeyError:
+            value = self._cache[index] = super(CachedChanList, self).__getitem__(index)
+            return value
+
+
+def compileRuleExpression(expression):
+    """Compile a rule expression, reusing the code object for identical ones.
+
+    Args:
+        expression (str) : The python expression of the rule.
+
+    Returns:
+        code : The compiled expression.
+    """
+    try:
+        return _RULE_CODE_CACHE[expression]
+    except KeyError:
+        code = compile(expression, '<rule: {}>'.format(expression), 'eval')
+        _RULE_CODE_CACHE[expression] = code
+        return code
+
+
+def channelsRead(expression):
+    """Find the indexes of the channels a rule expression reads.
+
+    Args:
+        expression (str) : The python expression of the rule.
+
+    Returns:
+        set : The ``ch[n]`` indexes, or None if the expression uses ``ch``
+            other than indexed with a constant, so any channel may be read.
+    """
+    try:
+        return _RULE_READS_CACHE[expression]
+    except KeyError:
+        pass
+
+    indexes = set()
+    names = indexed = 0
+    for node in ast.walk(ast.parse(expression, mode='eval')):
+        if isinstance(node, ast.Name) and node.id == 'ch':
+            names += 1
+        elif isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) \
+                and node.value.id == 'ch':
+            index = node.slice
+            if isinstance(index, getattr(ast, 'Index', ())):
+                index = index.value
+            try:
+                index = ast.literal_eval(index)
+            except ValueError:
+                continue
+            if isinstance(index, int):
+                indexes.add(index)
+                indexed += 1
+
+    # any other use of ch, e.g. ch[i] or f(ch), may read any channel
+    if names != indexed:
+        indexes = None
+
+    _RULE_READS_CACHE[expression] = indexes
+    return indexes
+
+
+class Rule(object):
+    """A widget rule compiled once and evaluated at most once per batch.
+
+    The rule is triggered through :attr:`slot`, which is coalesced so that
+    when several trigger channels change in the same status cycle the
+    expression is only evaluated once, after all of them have been updated.
+
+    The last result is remembered and the widget setter is only called when
+    the result changes. This matters most for ``Style Class`` rules, where
+    each call re-polishes the widget's QSS. The number of calls saved is
+    counted in :attr:`Rule.stats`.
+
+    Args:
+        widget (VCPBaseWidget) : The widget the rule applies to.
+        setter (str) : Name of the widget method to call with the result.
+        expression (str) : The python expression of the rule.
+        channels (ChanList) : Functions returning the channel values.
+    """
+    # totals for all rules, see getRuleStats()
+    stats = {'evaluations': 0, 'setter_calls_saved': 0, 'repolishes_saved': 0}
+
+    _NO_RESULT = object()
+
+    def __init__(self, widget, setter, expression, channels):
+        self.expression = expression
+        self.code = compileRuleExpression(expression)
+
+        self.widget = widget
+        self.setter = getattr(widget, setter)
+        self.repolishes = setter == 'setStyleClass'
+        self.result = self._NO_RESULT
+
+        self.ch = CachedChanList(channels)
+        self.env = {'ch': self.ch, 'widget': widget}
+
+        self.slot = coalesced(self.trigger)
+
+    def evaluate(self):
+        """Evaluate the expression and pass the result to the setter."""
+        self.ch.clearCache()
+        result = eval(self.code, self.env)
+        Rule.stats['evaluations'] += 1
+
+        if result is self.result or (type(result) is type(self.result)
+                                     and result == self.result):
+            Rule.stats['setter_calls_saved'] += 1
+            if self.repolishes:
+                Rule.stats['repolishes_saved'] += 1
+            return
+
+        self.result = result
+        self.setter(result)
+
+    def trigger(self):
+        try:
+            self.evaluate()
+        except Exception:
+            LOG.exception('Error calling rules expression: %s', self.expression)
+
+
+def getRuleStats():
+    """Get the rule evaluation counters.
+
+    Returns:
+        dict : The number of rule ``evaluations``, the number of widget
+            ``setter_calls_saved`` because the result did not change, and how
+            many of those were QSS ``repolishes_saved``.
+    """
+    return dict(Rule.stats)
+
+
 class VCPPrimitiveWidget(object):
     """VCPPrimitiveWidget.
 
@@ -67,6 +226,7 @@ class VCPBaseWidget(VCPPrimitiveWidget):
         self._rules = '[]'
         self._style = ''
         self._data_channels = []
+        self._compiled_rules = []
 
     def setStyleClass(self, style_class):
         """Set the QSS style class for the widget"""
@@ -119,7 +279,9 @@ class VCPBaseWidget(VCPPrimitiveWidget):
     @rules.setter
     def rules(self, rules):
         self._rules = rules or '[]'
-        self.registerRules()
+        with profiler.span(self.objectName() or self.__class__.__name__,
+                           'widget.rules', cls=self.__class__.__name__):
+            self.registerRules()
 
     def registerRules(self):
         rules = json.loads(self._rules)
@@ -137,7 +299,7 @@ class VCPBaseWidget(VCPPrimitiveWidget):
                     ch.append(chan_exp)
 
                     if chan.get('trigger', False):
-                        triggers.append(chan_obj.notify)
+                        triggers.append((len(ch) - 1, url, chan_obj.notify))
 
                 except Exception:
                     LOG.exception("Error evaluating rule: {}"
@@ -151,20 +313,28 @@ class VCPBaseWidget(VCPPrimitiveWidget):
                 self._data_channels = ch
                 continue
 
-            eval_env = {'ch': ch, 'widget': self}
-            eval_exp = 'lambda: widget.{}({})'.format(
-                            prop[0], rule['expression'].encode('utf-8'))
-            exp = eval(eval_exp, eval_env)
+            try:
+                compiled_rule = Rule(self, prop[0], rule['expression'], ch)
+            except SyntaxError:
+                LOG.exception('Error compiling rules expression:')
+                continue
 
             # initial call to update
             try:
-                exp()
+                compiled_rule.evaluate()
             except:
                 LOG.exception('Error calling rules expression:')
                 continue
 
-            for trigger in triggers:
-                trigger(exp)
+            reads = channelsRead(rule['expression'])
+            for index, url, trigger in triggers:
+                if reads is not None and index not in reads \
+                        and index - len(ch) not in reads:
+                    LOG.warning("Rule trigger channel is not read by the "
+                                "expression: %s", url)
+                trigger(compiled_rule.slot)
+
+            self._compiled_rules.append(compiled_rule)
 
 
 class VCPWidget(VCPBaseWidget):
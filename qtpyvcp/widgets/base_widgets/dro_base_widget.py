@@ -79,6 +79,11 @@ class DROBaseWidget(VCPWidget):
         self._fmt = self._in_fmt
         self._input_type = 'number:float'
 
+        # the position plugin's formatted string channel for the current
+        # ref type, axis, format and lathe mode, set once initialized
+        self._text_chan = None
+        self._dro_initialized = False
+
         self.updateValue()
 
         self.status.program_units.notify(self.updateUnits, 'string')
@@ -105,10 +110,12 @@ class DROBaseWidget(VCPWidget):
                 self._fmt = self._mm_fmt
 
         # force update
+        self.updateTextChannel()
         self.updateValue()
 
     def initialize(self):
-        getattr(self.pos, self._ref_typ.name).notify(self.updateValue)
+        self._dro_initialized = True
+        self.updateTextChannel()
         self.updateValue()
 
         if self._is_lathe:
@@ -132,20 +139,47 @@ class DROBaseWidget(VCPWidget):
 
     def updateDiameterMode(self, gcodes):
         self._g7_active = 'G7' in gcodes
+        self.updateTextChannel()
+        self.updateValue()
+
+    def isDiameterMode(self):
+        """Whether the value is shown as a lathe diameter."""
+        return self._is_lathe and self._anum == Axis.X and \
+            (self._lathe_mode == LatheMode.Diameter or
+             (self._lathe_mode == LatheMode.Auto and self._g7_active))
+
+    def updateTextChannel(self):
+        """Subscribe to the formatted position string matching the current
+        settings. The position plugin formats the value once for all the
+        DROs showing it, and only notifies when the string changes."""
+        if not self._dro_initialized:
+            return
+
+        chan = self.pos.stringChannel(self._ref_typ.name, self._anum, self._fmt,
+                                      2 if self.isDiameterMode() else 1)
+        if chan is self._text_chan:
+            return
+
+        if self._text_chan is not None:
+            self._text_chan.signal.disconnect(self._onTextChanged)
+
+        self._text_chan = chan
+        self._text_chan.signal.connect(self._onTextChanged)
+
+    def _onTextChanged(self, text):
         self.updateValue()
 
     def updateValue(self, pos=None):
         """Update the displayed position."""
         if pos is None:
-            pos = getattr(self.pos, self._ref_typ.name).getValue()
+            if self._text_chan is not None:
+                self.setText(self._text_chan.value)
+                return
 
-        if self._is_lathe and self._anum == Axis.X:
-            if self._lathe_mode == LatheMode.Diameter or \
-                    (self._lathe_mode == LatheMode.Auto and self._g7_active):
-                self.setText(self._fmt % (pos[self._anum] * 2))
-            else:
-                self.setText(self._fmt % pos[self._anum])
+            pos = getattr(self.pos, self._ref_typ.name).getValue()
 
+        if self.isDiameterMode():
+            self.setText(self._fmt % (pos[self._anum] * 2))
         else:
             self.setText(self._fmt % pos[self._anum])
 
@@ -156,6 +190,7 @@ class DROBaseWidget(VCPWidget):
     @referenceType.setter
     def referenceType(self, ref_type):
         self._ref_typ = RefType(ref_type)
+        self.updateTextChannel()
         self.updateValue()
 
     @Property(int)
@@ -168,6 +203,7 @@ class DROBaseWidget(VCPWidget):
         if axis in [3, 4, 5]:
             self._angular_axis = True
             self._fmt = self._deg_fmt
+        self.updateTextChannel()
         self.updateValue()
 
     @Property(str)
@@ -260,6 +296,7 @@ class DROBaseWidget(VCPWidget):
     @latheMode.setter
     def latheMode(self, mode):
         self._lathe_mode = LatheMode(mode)
+        self.updateTextChannel()
         self.updateValue()
 
     @Property(str)
@@ -2,11 +2,11 @@
 
 import os
 
-from qtpy import uic
 from qtpy.QtCore import Qt
 from qtpy.QtWidgets import QDialog
 
 from qtpyvcp.utilities.logger import getLogger
+from qtpyvcp.utilities.ui_cache import loadUi
 
 LOG = getLogger(__name__)
 
@@ -95,7 +95,7 @@ class BaseDialog(QDialog):
             return
 
         LOG.debug("Loading dialog from ui_file: %s", ui_file)
-        uic.loadUi(ui_file, self)
+        loadUi(ui_file, self)
 
     def setWindowFlag(self, flag, on):
         """BackPort QWidget.setWindowFlag() implementation from Qt 5.9
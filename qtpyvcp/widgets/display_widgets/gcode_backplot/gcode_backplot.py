@@ -33,7 +33,7 @@ from qtpyvcp.utilities import logger
 
 LOG = logger.getLogger(__name__)
 
-from qtpyvcp.plugins import getPlugin
+from qtpyvcp.plugins import getPlugin, coalesced
 
 STATUS = getPlugin('status')
 
@@ -74,16 +74,22 @@ class GcodeBackplot(QBackPlot):
 
         self.abortButton.clicked.connect(self.abort)
 
-        STATUS.actual_position.onValueChanged(self.update)
-        STATUS.joint_actual_position.onValueChanged(self.update)
-        STATUS.homed.onValueChanged(self.update)
-        STATUS.limit.onValueChanged(self.update)
-        STATUS.tool_in_spindle.onValueChanged(self.update)
-        STATUS.motion_mode.onValueChanged(self.update)
-        STATUS.current_vel.onValueChanged(self.update)
-
-        STATUS.g5x_offset.onValueChanged(self.reloadBackplot)
-        STATUS.g92_offset.onValueChanged(self.reloadBackplot)
+        # repaint at most once per status cycle
+        self._update_slot = coalesced(self.update)
+        STATUS.actual_position.onValueChanged(self._update_slot)
+        STATUS.joint_actual_position.onValueChanged(self._update_slot)
+        STATUS.homed.onValueChanged(self._update_slot)
+        STATUS.limit.onValueChanged(self._update_slot)
+        STATUS.tool_in_spindle.onValueChanged(self._update_slot)
+        STATUS.motion_mode.onValueChanged(self._update_slot)
+        STATUS.current_vel.onValueChanged(self._update_slot)
+
+        # offset changes move the program when possible, instead of
+        # reloading it, see QBackPlot.apply_offsets
+        self._offsets_slot = coalesced(self.applyOffsets)
+        STATUS.g5x_offset.onValueChanged(self._offsets_slot)
+        STATUS.g92_offset.onValueChanged(self._offsets_slot)
+        STATUS.rotation_xy.onValueChanged(self._offsets_slot)
 
         # Connect status signals
         STATUS.file.notify(self.loadBackplot)
@@ -95,6 +101,11 @@ class GcodeBackplot(QBackPlot):
         self._reload_filename = fname
         self.load(fname)
 
+    @Slot()
+    def applyOffsets(self):
+        if not self.apply_offsets():
+            self.reloadBackplot()
+
     @Slot()
     def reloadBackplot(self):
         QTimer.singleShot(100, lambda: self._reloadBackplot())
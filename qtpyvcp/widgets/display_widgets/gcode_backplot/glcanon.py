@@ -491,9 +491,12 @@ class GlCanonDraw:
             glInitNames()
             glPushName(0)
 
+            glPushMatrix()
+            glTranslatef(*self.get_program_offset())
             if self.get_show_rapids():
                 glCallList(self.dlist('select_rapids', gen=self.make_selection_list))
             glCallList(self.dlist('select_norapids', gen=self.make_selection_list))
+            glPopMatrix()
 
             try:
                 buffer = list(glRenderMode(GL_RENDER))
@@ -853,6 +856,11 @@ class GlCanonDraw:
             self.to_internal_units([fudge(ax[i]['max_position_limit'])
                 for i in range(3)]))
 
+    def get_program_offset(self):
+        # translation applied to the program display lists, used to follow
+        # offset changes without reloading the program
+        return (0, 0, 0)
+
     def get_foam_z(self):
         if self.canon: return self.canon.foam_z
         return 0
@@ -1077,10 +1085,13 @@ class GlCanonDraw:
                 glEnable(GL_BLEND)
                 glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
+            glPushMatrix()
+            glTranslatef(*self.get_program_offset())
             if self.get_show_rapids():
                 glCallList(self.dlist('program_rapids', gen=self.make_main_list))
             glCallList(self.dlist('program_norapids', gen=self.make_main_list))
             glCallList(self.dlist('highlight'))
+            glPopMatrix()
 
             if self.get_program_alpha():
                 glDisable(GL_BLEND)
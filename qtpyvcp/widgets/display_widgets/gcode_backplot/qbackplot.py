@@ -50,6 +50,7 @@ except ImportError:
 import gcode
 import linuxcnc
 from rs274 import interpret
+from qtpyvcp.lib.program_offsets import ProgramOffsets, readsOffsetParameters
 from qtpyvcp.widgets.display_widgets.gcode_backplot import glcanon, glnav
 
 
@@ -126,6 +127,7 @@ class StatCanon(glcanon.GLCanon, interpret.StatMixin):
         self.aborted = False
         self.total_lines = line_count
         self.previous_progress = 0
+        self.offsets = ProgramOffsets()
 
     def change_tool(self, pocket):
         glcanon.GLCanon.change_tool(self, pocket)
@@ -135,6 +137,18 @@ class StatCanon(glcanon.GLCanon, interpret.StatMixin):
         if self.aborted:
             raise KeyboardInterrupt
 
+    def set_g5x_offset(self, index, x, y, z, *args):
+        glcanon.GLCanon.set_g5x_offset(self, index, x, y, z, *args)
+        self.offsets.setG5xOffset(index, x, y, z)
+
+    def set_g92_offset(self, x, y, z, *args):
+        glcanon.GLCanon.set_g92_offset(self, x, y, z, *args)
+        self.offsets.setG92Offset(x, y, z)
+
+    def set_xy_rotation(self, rotation):
+        glcanon.GLCanon.set_xy_rotation(self, rotation)
+        self.offsets.setRotation(rotation)
+
     def next_line(self, st):
         self.state = st
         self.lineno = self.state.sequence_number
@@ -192,6 +206,7 @@ class QBackPlot(QGLWidget, glcanon.GlCanonDraw, glnav.GlNavBase):
 
         self.current_file = None
         self.program_length = 0
+        self.program_offset = (0.0, 0.0, 0.0)
         self.highlight_line = None
         self.program_alpha = False
         self.use_joints_mode = False
@@ -269,6 +284,8 @@ class QBackPlot(QGLWidget, glcanon.GlCanonDraw, glnav.GlNavBase):
             except KeyboardInterrupt:
                 result, seq = 0, 0
             self.report_loading_finished()
+            self.canon.offsets.reads_parameters = readsOffsetParameters(filename)
+            self.program_offset = (0.0, 0.0, 0.0)
             if result > gcode.MIN_ERROR:
                 self.report_gcode_error(result, seq, filename)
                 # FixMe instead of just loading an empty file find a way
@@ -282,6 +299,53 @@ class QBackPlot(QGLWidget, glcanon.GlCanonDraw, glnav.GlNavBase):
             shutil.rmtree(td)
         self.set_current_view()
 
+    def apply_offsets(self):
+        """Move the loaded program to the current work offsets.
+
+        The program geometry has the offsets that were active when it was
+        loaded baked in. If it was parsed in a single coordinate system, does
+        not depend on the offsets itself and the XY rotation is unchanged the
+        offset change is a translation, which is applied to the display
+        lists instead of reloading the program.
+
+        Returns:
+            bool : True if the offsets were applied, False if the program
+                needs to be reloaded.
+        """
+        canon = self.canon
+        if canon is None:
+            return False
+
+        s = self.stat
+        s.poll()
+
+        offsets = canon.offsets
+        if offsets.dependent or offsets.indexes != [s.g5x_index]:
+            return False
+
+        pre, rotation, post = offsets.transform(s.g5x_index,
+                                                self.to_internal_units(s.g5x_offset)[:3],
+                                                s.rotation_xy,
+                                                self.to_internal_units(s.g92_offset)[:3])
+        if abs(rotation) > 1e-9:
+            return False
+
+        offset = tuple(a + b for a, b in zip(pre, post))
+        delta = [new - old for new, old in zip(offset, self.program_offset)]
+        self.program_offset = offset
+
+        # keep the extents in sync with the displayed program
+        for name in ('min_extents', 'max_extents',
+                     'min_extents_notool', 'max_extents_notool'):
+            extents = getattr(canon, name)
+            setattr(canon, name, [v + d for v, d in zip(extents, delta)])
+
+        self.update()
+        return True
+
+    def get_program_offset(self):
+        return self.program_offset
+
     def count_lines(self, fname):
         lines = 0
         buf_size = 1024 * 1024
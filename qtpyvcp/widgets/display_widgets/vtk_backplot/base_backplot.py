@@ -2,9 +2,12 @@ import gcode
 import linuxcnc
 import os
 import shutil
+import tempfile
 
 from qtpyvcp.lib.native_notification import NativeNotification
 
+from toolpath_cache import ToolpathCache
+
 IN_DESIGNER = os.getenv('DESIGNER', False)
 
 
@@ -33,7 +36,15 @@ class BaseBackPlot(object):
 
         temp = self.ini.find("RS274NGC", "PARAMETER_FILE") or "linuxcnc.var"
         self.parameter_file = os.path.join(self.config_dir, temp)
-        self.temp_parameter_file = os.path.join(self.parameter_file + '.temp')
+
+        # cache of parsed programs, set BACKPLOT_CACHE = false to disable
+        temp = self.ini.find("DISPLAY", "BACKPLOT_CACHE") or "true"
+        if temp.lower() in ["0", "false", "no"]:
+            self.toolpath_cache = None
+        else:
+            temp = self.ini.find("DISPLAY", "BACKPLOT_CACHE_DIR") or ".backplot_cache"
+            cache_dir = os.path.join(self.config_dir, os.path.expanduser(temp))
+            self.toolpath_cache = ToolpathCache(cache_dir)
 
         self.last_filename = None
 
@@ -41,6 +52,16 @@ class BaseBackPlot(object):
         if self.canon is None:
             return
 
+        filename = self.resolve_filename(filename)
+        if filename is None:
+            return
+
+        unitcode, initcode = self.init_codes()
+        result, seq = self.parse(filename, self.canon, unitcode, initcode)
+        self.report_parse_result(result, seq, filename)
+
+    def resolve_filename(self, filename=None):
+        """Returns the program file to load, or None if it is not valid."""
         filename = filename or self.last_filename
         if filename is None:
             self.stat.poll()
@@ -50,39 +71,58 @@ class BaseBackPlot(object):
             self.canon = None
             self.notification.setNotify("3D plot", "Can't load backplot, invalid file: {}".format(filename))
             # raise ValueError("Can't load backplot, invalid file: {}".format(filename))
+            return None
 
         self.last_filename = filename
+        return filename
 
-        if os.path.exists(self.parameter_file):
-            shutil.copy(self.parameter_file, self.temp_parameter_file)
-
-        self.canon.parameter_file = self.temp_parameter_file
-
+    def init_codes(self):
+        """Returns the unit code and startup code to run before the program."""
         # Some initialization g-code to set the units and optional user code
         unitcode = "G%d" % (20 + (self.stat.linear_units == 1))
         initcode = self.ini.find("RS274NGC", "RS274NGC_STARTUP_CODE") or ""
+        return unitcode, initcode
+
+    def parse(self, filename, canon, unitcode, initcode):
+        """Run the program through the interpreter, calling back to `canon`.
 
-        # THIS IS WHERE IT ALL HAPPENS: load_preview will execute the code,
-        # call back to the canon with motion commands, and record a history
-        # of all the movements.
+        This does not touch any Qt or VTK objects, so it is safe to call from
+        a worker thread. ``gcode.parse`` uses a single, global interpreter and
+        is not reentrant, so only one parse may run at a time. An aborted
+        parse must return before a new one is started.
 
+        Returns:
+            tuple : The ``(result, seq)`` returned by ``gcode.parse``.
+        """
+        temp_dir = tempfile.mkdtemp()
         try:
-            result, seq = gcode.parse(filename, self.canon, unitcode, initcode)
-
-            if result > gcode.MIN_ERROR:
-                msg = gcode.strerror(result)
-                fname = os.path.basename(filename)
-                self.notification.setNotify("3D plot", "Error in {} line {}\n{}".format(fname, seq - 1, msg))
-                # raise SyntaxError("Error in %s line %i: %s" % (fname, seq - 1, msg))
-
-        except KeyboardInterrupt:
-            # probably raised by an (AXIS, stop) comment in the G-code file
-            # abort generating the backplot
-            pass
-
-        # clean up temp var file and the backup
-        os.unlink(self.temp_parameter_file)
-        os.unlink(self.temp_parameter_file + '.bak')
+            temp_parameter_file = os.path.join(temp_dir, os.path.basename(self.parameter_file))
+            if os.path.exists(self.parameter_file):
+                shutil.copy(self.parameter_file, temp_parameter_file)
+
+            canon.parameter_file = temp_parameter_file
+
+            # THIS IS WHERE IT ALL HAPPENS: load_preview will execute the code,
+            # call back to the canon with motion commands, and record a history
+            # of all the movements.
+            try:
+                return gcode.parse(filename, canon, unitcode, initcode)
+
+            except KeyboardInterrupt:
+                # probably raised by an (AXIS, stop) comment in the G-code file
+                # or by aborting the load, abort generating the backplot
+                return 0, 0
+
+        finally:
+            # clean up temp var file and the backup
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def report_parse_result(self, result, seq, filename):
+        if result > gcode.MIN_ERROR:
+            msg = gcode.strerror(result)
+            fname = os.path.basename(filename)
+            self.notification.setNotify("3D plot", "Error in {} line {}\n{}".format(fname, seq - 1, msg))
+            # raise SyntaxError("Error in %s line %i: %s" % (fname, seq - 1, msg))
 
 
 if __name__ == "__main__":
@@ -35,6 +35,29 @@ class PathActor(vtk.vtkActor):
         self.poly_data = vtk.vtkPolyData()
         self.data_mapper = vtk.vtkPolyDataMapper()
 
+        # decimated versions of poly_data as (max error, poly data) tuples,
+        # finest first
+        self.levels_of_detail = []
+        self.shown_poly_data = None
+
+    def set_levels_of_detail(self, lods):
+        self.levels_of_detail = lods
+        self.shown_poly_data = self.poly_data
+
+    def set_max_error(self, max_error=None):
+        """Show the coarsest level of detail whose error is within
+        `max_error`, or the full detail path if `max_error` is None."""
+        poly_data = self.poly_data
+        if max_error is not None:
+            for error, lod in self.levels_of_detail:
+                if error > max_error:
+                    break
+                poly_data = lod
+
+        if poly_data is not self.shown_poly_data:
+            self.shown_poly_data = poly_data
+            self.data_mapper.SetInputData(poly_data)
+
     def set_origin_index(self, index):
         self.origin_index = index
 
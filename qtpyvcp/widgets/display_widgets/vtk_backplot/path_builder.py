@@ -0,0 +1,348 @@
+"""Bulk construction of tool path geometry.
+
+The canon callbacks append each move to a :class:`PathBuilder`, which stores
+the segment end points, the line type index and the program line number in
+preallocated NumPy arrays that grow geometrically.  Once the program has been parsed
+:meth:`PathBuilder.build` hands the arrays to VTK in one go using
+``vtk.util.numpy_support``, instead of creating a ``vtkLine`` and inserting
+points one at a time for every segment.
+
+Large paths also get decimated levels of detail, which the backplot shows
+while the view is being moved.
+"""
+
+import numpy as np
+
+import vtk
+from vtk.util.numpy_support import (numpy_to_vtk, numpy_to_vtkIdTypeArray,
+                                    ID_TYPE_CODE)
+
+LINE_TYPES = ('traverse', 'arcfeed', 'feed', 'dwell', 'user')
+
+_LINE_TYPE_INDEX = {name: index for index, name in enumerate(LINE_TYPES)}
+
+# number of segments to allocate room for when an empty builder grows
+DEFAULT_CAPACITY = 4096
+
+# paths with fewer segments are always drawn at full detail
+LOD_MIN_SEGMENTS = 100000
+
+
+class PathBuilder(object):
+    """Accumulates path segments for one WCS.
+
+    Args:
+        capacity (int, optional) : The initial number of segments to
+            allocate room for.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._capacity = max(int(capacity), 1)
+        self._segments = np.empty((self._capacity, 2, 3), dtype=np.float64)
+        self._types = np.empty(self._capacity, dtype=np.uint8)
+        self._seqs = np.empty(self._capacity, dtype=np.int32)
+        self._count = 0
+        self._lods = []
+
+    @classmethod
+    def from_arrays(cls, segments, types, seqs):
+        """Create a builder holding existing arrays, without copying them.
+
+        The arrays may be read only (e.g. memory mapped), in which case the
+        builder can be built but not added to.
+        """
+        builder = cls.__new__(cls)
+        builder._segments = segments
+        builder._types = types
+        builder._seqs = seqs
+        builder._capacity = builder._count = len(segments)
+        builder._lods = []
+        return builder
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def segments(self):
+        """ndarray : ``(N, 2, 3)`` view of the segment start and end points."""
+        return self._segments[:self._count]
+
+    @property
+    def types(self):
+        """ndarray : ``(N,)`` view of the line type index of each segment."""
+        return self._types[:self._count]
+
+    @property
+    def seqs(self):
+        """ndarray : ``(N,)`` view of the program line of each segment."""
+        return self._seqs[:self._count]
+
+    def add(self, line_type, start_point, end_point, seq=0):
+        """Append a segment.
+
+        Args:
+            line_type (str) : One of :data:`LINE_TYPES`.
+            start_point (tuple) : The XYZ start point of the segment.
+            end_point (tuple) : The XYZ end point of the segment.
+            seq (int, optional) : The program line the segment comes from.
+        """
+        if self._count == self._capacity:
+            self._grow()
+
+        segment = self._segments[self._count]
+        segment[0] = start_point[:3]
+        segment[1] = end_point[:3]
+        self._types[self._count] = _LINE_TYPE_INDEX[line_type]
+        self._seqs[self._count] = seq
+        self._count += 1
+
+    def extend(self, segments, types, seqs):
+        """Append segments in bulk.
+
+        Args:
+            segments (ndarray) : ``(N, 2, 3)`` array of segment points.
+            types (ndarray) : ``(N,)`` array of line type indexes.
+            seqs (ndarray) : ``(N,)`` array of program lines.
+        """
+        count = len(segments)
+        while self._count + count > self._capacity:
+            self._grow()
+
+        self._segments[self._count:self._count + count] = segments
+        self._types[self._count:self._count + count] = types
+        self._seqs[self._count:self._count + count] = seqs
+        self._count += count
+
+    def clear(self):
+        """Discard all the segments and release the memory.
+
+        The buffers are reallocated when the next segment is added.
+        """
+        self._count = 0
+        self._capacity = 0
+        self._segments = np.empty((0, 2, 3), dtype=np.float64)
+        self._types = np.empty(0, dtype=np.uint8)
+        self._seqs = np.empty(0, dtype=np.int32)
+        self._lods = []
+
+    def prepare(self):
+        """Compute the decimated levels of detail of the path.
+
+        Only paths of at least :data:`LOD_MIN_SEGMENTS` segments get levels
+        of detail, see :func:`levels_of_detail`. For large paths this takes
+        a while, so it is done in the worker thread that parsed the program,
+        leaving only the VTK objects to be created by :meth:`build`.
+        """
+        self._lods = []
+        if self._count >= LOD_MIN_SEGMENTS:
+            self._lods = levels_of_detail(self.segments, self.types)
+
+    def _grow(self):
+        count = self._count
+        self._capacity = max(self._capacity * 2, DEFAULT_CAPACITY)
+
+        segments = np.empty((self._capacity, 2, 3), dtype=np.float64)
+        types = np.empty(self._capacity, dtype=np.uint8)
+        seqs = np.empty(self._capacity, dtype=np.int32)
+
+        segments[:count] = self._segments[:count]
+        types[:count] = self._types[:count]
+        seqs[:count] = self._seqs[:count]
+
+        self._segments, self._types, self._seqs = segments, types, seqs
+
+    def build(self, path_actor, colors, scale=1.0):
+        """Load the segments into `path_actor`'s poly data.
+
+        The levels of detail computed by :meth:`prepare` are built as well.
+
+        Args:
+            path_actor (PathActor) : The actor to load the geometry into.
+            colors (dict) : Map of line type to QColor.
+            scale (float, optional) : Factor the points are multiplied by.
+        """
+        count = self._count
+
+        segments = self.segments
+        if scale != 1:
+            segments = segments * scale
+
+        lut = np.zeros((len(LINE_TYPES), 4), dtype=np.uint8)
+        for index, name in enumerate(LINE_TYPES):
+            color = colors.get(name)
+            if color is not None:
+                lut[index] = color.getRgb()[:4]
+
+        cell_colors = numpy_to_vtk(lut[self.types], deep=True,
+                                   array_type=vtk.VTK_UNSIGNED_CHAR)
+
+        path_actor.points.SetData(numpy_to_vtk(segments.reshape(count * 2, 3), deep=True))
+        path_actor.lines = _lineCells(count)
+        path_actor.colors = cell_colors
+
+        path_actor.poly_data.SetPoints(path_actor.points)
+        path_actor.poly_data.SetLines(path_actor.lines)
+        path_actor.poly_data.GetCellData().SetScalars(path_actor.colors)
+        path_actor.data_mapper.SetInputData(path_actor.poly_data)
+        path_actor.data_mapper.Update()
+        path_actor.SetMapper(path_actor.data_mapper)
+
+        lods = []
+        for max_error, lod_segments, lod_types in self._lods:
+            if scale != 1:
+                max_error, lod_segments = max_error * scale, lod_segments * scale
+            lods.append((max_error, _polyData(lod_segments, lut[lod_types])))
+
+        path_actor.set_levels_of_detail(lods)
+
+
+def merge_collinear(segments, types, tolerance=1e-9):
+    """Merge runs of connected, collinear segments of the same line type.
+
+    Args:
+        segments (ndarray) : ``(N, 2, 3)`` array of segment points.
+        types (ndarray) : ``(N,)`` array of line type indexes.
+        tolerance (float, optional) : The maximum sine of the angle between
+            two segments for them to be considered collinear.
+
+    Returns:
+        tuple : The merged ``(segments, types)`` arrays.
+    """
+    count = len(segments)
+    if count < 2:
+        return segments, types
+
+    directions = segments[:, 1] - segments[:, 0]
+    a = directions[:-1]
+    b = directions[1:]
+
+    cross = np.cross(a, b)
+    norms = np.sqrt(np.einsum('ij,ij->i', a, a) * np.einsum('ij,ij->i', b, b))
+
+    join = (np.all(segments[:-1, 1] == segments[1:, 0], axis=1)
+            & (types[:-1] == types[1:])
+            & (np.einsum('ij,ij->i', a, b) > 0)
+            & (np.sqrt(np.einsum('ij,ij->i', cross, cross)) <= tolerance * norms))
+
+    starts = np.flatnonzero(np.concatenate(([True], ~join)))
+    ends = np.concatenate((starts[1:] - 1, [count - 1]))
+
+    merged = np.empty((len(starts), 2, 3), dtype=segments.dtype)
+    merged[:, 0] = segments[starts, 0]
+    merged[:, 1] = segments[ends, 1]
+
+    return merged, types[starts]
+
+
+def cluster_segments(segments, types, cell_size):
+    """Simplify a path by snapping its points to a grid.
+
+    Points are moved to the center of their grid cell, segments that
+    collapse to a single cell are dropped and duplicate segments are
+    removed, so no point moves by more than ``cell_size * sqrt(3) / 2``.
+
+    Args:
+        segments (ndarray) : ``(N, 2, 3)`` array of segment points.
+        types (ndarray) : ``(N,)`` array of line type indexes.
+        cell_size (float) : The grid spacing.
+
+    Returns:
+        tuple : The simplified ``(segments, types)`` arrays.
+    """
+    cells = np.floor(segments / cell_size).astype(np.int64)
+
+    keep = np.any(cells[:, 0] != cells[:, 1], axis=1)
+    cells = cells[keep]
+    types = types[keep]
+
+    # order the end points of each segment, so that the same segment drawn
+    # in both directions is detected as a duplicate
+    start, end = cells[:, 0], cells[:, 1]
+    diff = end - start
+    first = np.argmax(diff != 0, axis=1)
+    flip = diff[np.arange(len(diff)), first] < 0
+
+    low = np.where(flip[:, None], end, start)
+    high = np.where(flip[:, None], start, end)
+
+    keys = np.column_stack((low, high, types))
+    _, unique = np.unique(keys, axis=0, return_index=True)
+    unique.sort()
+
+    simplified = (cells[unique] + 0.5) * cell_size
+    return simplified, types[unique]
+
+
+def levels_of_detail(segments, types, levels=(1024, 256, 64), min_reduction=0.75):
+    """Build decimated versions of a path.
+
+    The first level merges collinear segments, which does not change the
+    path. Each further level clusters the points to a grid of cell size
+    ``diagonal / n`` for each ``n`` in `levels`. A level is only kept if it
+    has at most `min_reduction` times the segments of the previous one.
+
+    Args:
+        segments (ndarray) : ``(N, 2, 3)`` array of segment points.
+        types (ndarray) : ``(N,)`` array of line type indexes.
+
+    Returns:
+        list : ``(max_error, segments, types)`` tuples, finest first.
+    """
+    lods = []
+
+    merged, merged_types = merge_collinear(segments, types)
+    if len(merged) <= len(segments) * min_reduction:
+        lods.append((0.0, merged, merged_types))
+
+    points = segments.reshape(-1, 3)
+    diagonal = np.linalg.norm(points.max(axis=0) - points.min(axis=0))
+    if diagonal == 0:
+        return lods
+
+    count = len(merged)
+    for n in levels:
+        cell_size = diagonal / n
+        simplified, simplified_types = cluster_segments(merged, merged_types, cell_size)
+        if len(simplified) <= count * min_reduction:
+            lods.append((cell_size * 0.87, simplified, simplified_types))
+            count = len(simplified)
+
+    return lods
+
+
+def _polyData(segments, colors):
+    count = len(segments)
+
+    points = vtk.vtkPoints()
+    points.SetData(numpy_to_vtk(np.ascontiguousarray(segments.reshape(count * 2, 3)), deep=True))
+
+    poly_data = vtk.vtkPolyData()
+    poly_data.SetPoints(points)
+    poly_data.SetLines(_lineCells(count))
+    poly_data.GetCellData().SetScalars(numpy_to_vtk(colors, deep=True,
+                                                    array_type=vtk.VTK_UNSIGNED_CHAR))
+    return poly_data
+
+
+def _lineCells(count):
+    """Returns a vtkCellArray of `count` two point lines over consecutive
+    point pairs, i.e. line ``n`` connects points ``2n`` and ``2n + 1``."""
+    cells = vtk.vtkCellArray()
+    if count == 0:
+        return cells
+
+    if hasattr(cells, 'SetData') and hasattr(cells, 'GetOffsetsArray'):
+        # VTK >= 9, offsets + connectivity layout
+        offsets = np.arange(0, count * 2 + 1, 2, dtype=ID_TYPE_CODE)
+        connectivity = np.arange(count * 2, dtype=ID_TYPE_CODE)
+        cells.SetData(numpy_to_vtkIdTypeArray(offsets, deep=True),
+                      numpy_to_vtkIdTypeArray(connectivity, deep=True))
+    else:
+        # legacy layout, [npts, id0, id1, npts, id0, id1, ...]
+        legacy = np.empty((count, 3), dtype=ID_TYPE_CODE)
+        legacy[:, 0] = 2
+        legacy[:, 1] = np.arange(0, count * 2, 2)
+        legacy[:, 2] = legacy[:, 1] + 1
+        cells.SetCells(count, numpy_to_vtkIdTypeArray(legacy.ravel(), deep=True))
+
+    return cells
@@ -0,0 +1,120 @@
+import time
+
+from qtpy.QtCore import QThread, Signal
+
+from qtpyvcp.lib.program_offsets import readsOffsetParameters
+from qtpyvcp.utilities import logger
+
+LOG = logger.getLogger(__name__)
+
+
+def count_lines(fname):
+    lines = 0
+    buf_size = 1024 * 1024
+    with open(fname, 'rb') as fh:
+        read_f = fh.read
+        buf = read_f(buf_size)
+        while buf:
+            lines += buf.count(b'\n')
+            buf = read_f(buf_size)
+    return lines + 1
+
+
+class ProgramLoader(QThread):
+    """Parses a G-code program into a canon in a worker thread.
+
+    The canon must be created in the GUI thread, the worker only runs
+    ``gcode.parse``, which calls back into the canon and fills its path
+    builders. If the backplot has a toolpath cache the path builders are
+    loaded from it when possible, and saved to it after a parse. The levels
+    of detail of the paths are computed in the worker too. Once the thread
+    has finished the canon can be turned into actors with ``draw_lines`` in
+    the GUI thread.
+
+    ``gcode.parse`` is not reentrant, so a loader must not be started while
+    another one, cancelled or not, is still running.
+
+    Args:
+        backplot (BaseBackPlot) : The backplot, used to run the parse.
+        canon (VTKCanon) : The canon to parse the program into.
+        filename (str) : The program to load.
+        unitcode (str) : The G20/G21 code to run before the program.
+        initcode (str) : The RS274NGC_STARTUP_CODE to run before the program.
+    """
+    progress = Signal(int)
+
+    def __init__(self, backplot, canon, filename, unitcode, initcode, parent=None):
+        super(ProgramLoader, self).__init__(parent)
+
+        self.backplot = backplot
+        self.canon = canon
+        self.filename = filename
+        self.unitcode = unitcode
+        self.initcode = initcode
+
+        # set once run() completes, None if the parse raised
+        self.result = None
+        self.seq = None
+
+    @property
+    def cancelled(self):
+        return self.canon.aborted
+
+    def cancel(self):
+        """Abort the parse at the next line. The thread still emits
+        ``finished``, but the canon should be discarded."""
+        self.canon.aborted = True
+
+    def run(self):
+        start_time = time.time()
+
+        cache = self.backplot.toolpath_cache
+        key = None
+        if cache is not None:
+            key = cache.key(self.filename,
+                            self.backplot.parameter_file,
+                            self.canon.tools,
+                            self.unitcode,
+                            self.initcode,
+                            self.canon.get_block_delete())
+
+            cached = cache.load(key)
+            if cached is not None:
+                self.canon.path_points, self.canon.offsets, self.result, self.seq = cached
+                self.progress.emit(100)
+                LOG.debug("-------Cache load time %s seconds ---" % (time.time() - start_time))
+                self.prepare()
+                return
+
+        self.canon.total_lines = count_lines(self.filename)
+        self.canon.progress_callback = self.progress.emit
+
+        try:
+            self.result, self.seq = self.backplot.parse(self.filename,
+                                                        self.canon,
+                                                        self.unitcode,
+                                                        self.initcode)
+        except Exception:
+            LOG.exception("Error parsing program: {}".format(self.filename))
+            return
+
+        self.canon.offsets.reads_parameters = readsOffsetParameters(self.filename)
+
+        LOG.debug("-------Load time %s seconds ---" % (time.time() - start_time))
+
+        if key is not None and not self.cancelled:
+            cache.save(key, self.canon.path_points, self.canon.offsets,
+                       self.result, self.seq)
+
+        self.prepare()
+
+    def prepare(self):
+        """Compute the levels of detail of the parsed paths."""
+        start_time = time.time()
+
+        for builder in self.canon.path_points.values():
+            if self.cancelled:
+                return
+            builder.prepare()
+
+        LOG.debug("-------LOD time %s seconds ---" % (time.time() - start_time))
@@ -0,0 +1,222 @@
+"""On-disk cache of parsed tool paths.
+
+Parsing a large program through the interpreter can take a long time, but the
+result only depends on the program and the interpreter inputs. The
+:class:`ToolpathCache` stores the canon output (the path builder arrays of
+each WCS as raw ``.npy`` files, the offsets and the parse result), keyed by a
+hash of:
+
+* the program file content
+* the parameter file content (G5x/G92 offsets, named parameters)
+* the tool table
+* the unit code and ``RS274NGC_STARTUP_CODE``
+* the block delete switch
+
+Cached arrays are loaded memory mapped, so a hit costs little more than
+hashing the program file and VTK copying the arrays in.
+
+Each entry is a directory named after its key::
+
+    <cache dir>/<key>/index.json
+    <cache dir>/<key>/<wcs>-segments.npy
+    <cache dir>/<key>/<wcs>-types.npy
+    <cache dir>/<key>/<wcs>-seqs.npy
+
+Entries are written to a temporary directory and renamed into place, so a
+partially written entry is never read.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from qtpyvcp.lib.program_offsets import ProgramOffsets
+from qtpyvcp.utilities import logger
+
+from path_builder import PathBuilder
+
+LOG = logger.getLogger(__name__)
+
+# bump when the cached data format or the canon output changes
+CACHE_VERSION = 2
+
+_ARRAYS = ('segments', 'types', 'seqs')
+
+
+def _hash_file(hasher, fname, buf_size=1024 * 1024):
+    if fname is None or not os.path.isfile(fname):
+        hasher.update(b'\0')
+        return
+
+    with open(fname, 'rb') as fh:
+        buf = fh.read(buf_size)
+        while buf:
+            hasher.update(buf)
+            buf = fh.read(buf_size)
+
+
+class ToolpathCache(object):
+    """Cache of parsed tool paths.
+
+    Args:
+        cache_dir (str) : The directory to store the cache entries in.
+        max_entries (int, optional) : The number of programs to keep, the
+            least recently used entries are removed first.
+    """
+
+    def __init__(self, cache_dir, max_entries=10):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def key(self, filename, parameter_file, tools, unitcode, initcode,
+            block_delete=0):
+        """Returns the cache key for parsing `filename` with the given inputs.
+
+        Args:
+            filename (str) : The program file.
+            parameter_file (str) : The interpreter parameter file.
+            tools (list) : The tool table, as seen by the canon.
+            unitcode (str) : The G20/G21 code run before the program.
+            initcode (str) : The RS274NGC_STARTUP_CODE.
+            block_delete (int, optional) : The block delete switch state.
+        """
+        hasher = hashlib.sha1()
+        hasher.update(str(CACHE_VERSION).encode('utf-8'))
+
+        _hash_file(hasher, filename)
+        hasher.update(b'\0')
+        _hash_file(hasher, parameter_file)
+
+        inputs = (tuple(tuple(tool) for tool in tools), unitcode, initcode,
+                  int(bool(block_delete)))
+        hasher.update(repr(inputs).encode('utf-8'))
+
+        return hasher.hexdigest()
+
+    def load(self, key):
+        """Load a cache entry.
+
+        Args:
+            key (str) : The key returned by :meth:`key`.
+
+        Returns:
+            tuple : ``(path_points, offsets, result, seq)``, where
+                `path_points` is an OrderedDict of WCS index to PathBuilder
+                and `offsets` the ProgramOffsets the program was parsed with,
+                or None if there is no valid entry for `key`.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        index_file = os.path.join(entry_dir, 'index.json')
+        if not os.path.isfile(index_file):
+            return None
+
+        try:
+            with open(index_file) as fh:
+                index = json.load(fh)
+
+            if index.get('version') != CACHE_VERSION:
+                return None
+
+            path_points = OrderedDict()
+            for wcs_index in index['wcs']:
+                arrays = [np.load(os.path.join(entry_dir, '{}-{}.npy'.format(wcs_index, name)),
+                                  mmap_mode='r') for name in _ARRAYS]
+                path_points[wcs_index] = PathBuilder.from_arrays(*arrays)
+
+            offsets = ProgramOffsets()
+            offsets.g5x = {int(i): tuple(v) for i, v in index['g5x'].items()}
+            offsets.rotation = {int(i): v for i, v in index['rotation'].items()}
+            offsets.g92 = index['g92'] and tuple(index['g92'])
+            offsets.modified = index['modified']
+            offsets.reads_parameters = index['reads_parameters']
+
+            # mark as recently used
+            os.utime(entry_dir, None)
+
+        except Exception:
+            LOG.warning("Failed to load toolpath cache entry: {}".format(entry_dir),
+                        exc_info=True)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        return path_points, offsets, index['result'], index['seq']
+
+    def save(self, key, path_points, offsets, result, seq):
+        """Store the output of a parse.
+
+        Args:
+            key (str) : The key returned by :meth:`key`.
+            path_points (dict) : Map of WCS index to PathBuilder.
+            offsets (ProgramOffsets) : The offsets the program was parsed with.
+            result (int) : The result returned by ``gcode.parse``.
+            seq (int) : The sequence number returned by ``gcode.parse``.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.isdir(entry_dir):
+            return
+
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+
+            temp_dir = tempfile.mkdtemp(prefix='.' + key, dir=self.cache_dir)
+            try:
+                for wcs_index, builder in path_points.items():
+                    for name in _ARRAYS:
+                        np.save(os.path.join(temp_dir, '{}-{}.npy'.format(wcs_index, name)),
+                                getattr(builder, name))
+
+                index = {'version': CACHE_VERSION,
+                         'wcs': list(path_points.keys()),
+                         'g5x': offsets.g5x,
+                         'rotation': offsets.rotation,
+                         'g92': offsets.g92,
+                         'modified': offsets.modified,
+                         'reads_parameters': offsets.reads_parameters,
+                         'result': result,
+                         'seq': seq}
+
+                with open(os.path.join(temp_dir, 'index.json'), 'w') as fh:
+                    json.dump(index, fh)
+
+                os.rename(temp_dir, entry_dir)
+
+            except Exception:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                raise
+
+        except Exception:
+            LOG.warning("Failed to save toolpath cache entry: {}".format(entry_dir),
+                        exc_info=True)
+            return
+
+        self.prune()
+
+    def prune(self):
+        """Remove the least recently used entries over `max_entries`."""
+        try:
+            entries = [os.path.join(self.cache_dir, name)
+                       for name in os.listdir(self.cache_dir)
+                       if not name.startswith('.')]
+        except OSError:
+            return
+
+        # entries may be removed by another process while we look at them
+        mtimes = []
+        for entry in entries:
+            try:
+                mtimes.append((os.path.getmtime(entry), entry))
+            except OSError:
+                continue
+
+        mtimes.sort(reverse=True)
+        entries = [entry for mtime, entry in mtimes]
+
+        for entry_dir in entries[self.max_entries:]:
+            LOG.debug("Removing toolpath cache entry: {}".format(entry_dir))
+            shutil.rmtree(entry_dir, ignore_errors=True)
@@ -1,4 +1,5 @@
 import linuxcnc
+import math
 import os
 from collections import OrderedDict
 from operator import add
@@ -6,7 +7,7 @@ import time
 
 import vtk
 import vtk.qt
-from qtpy.QtCore import Property, Slot
+from qtpy.QtCore import Property, Signal, Slot, QTimer
 from qtpy.QtGui import QColor
 
 # Fix poligons not drawing correctly on some GPU
@@ -29,6 +30,7 @@ from tool_actor import ToolActor
 from path_cache_actor import PathCacheActor
 from program_bounds_actor import ProgramBoundsActor
 from vtk_canon import VTKCanon
+from program_loader import ProgramLoader
 from linuxcnc_datasource import LinuxCncDataSource
 
 LOG = logger.getLogger(__name__)
@@ -43,6 +45,21 @@ f.setSampleBuffers(True)
 QGLFormat.setDefaultFormat(f)
 
 class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
+    """VTK based G-code backplot.
+
+    Programs are parsed in a worker thread, so the UI stays responsive while
+    large programs load. The progress can be shown by connecting a progress
+    bar to the `programLoadProgress` signal, and the load can be cancelled
+    with the `abortProgramLoad` slot.
+    """
+    # emitted with the program file name when a load starts
+    programLoadStarted = Signal(str)
+    # emitted with the parse progress in percent
+    programLoadProgress = Signal(int)
+    # emitted with True when the new program is shown, False if it was
+    # aborted or failed to load
+    programLoadFinished = Signal(bool)
+
     def __init__(self, parent=None):
         super(VTKBackPlot, self).__init__(parent)
         LOG.debug("---------using refactored vtk code")
@@ -54,10 +71,23 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
         self.pan_mode = False
         self.line = None
         self._last_filename = str()
+        self._loader = None
+        # loaders that have not finished yet, including aborted ones
+        self._running_loaders = set()
+        # program to load once the running loaders have finished
+        self._pending_program = None
         self.rotating = 0
         self.panning = 0
         self.zooming = 0
 
+        # large paths are drawn decimated while the view is being moved, with
+        # an error of at most this many pixels
+        self.lod_pixel_error = 2.0
+        self._lod_timer = QTimer(self)
+        self._lod_timer.setSingleShot(True)
+        self._lod_timer.setInterval(300)
+        self._lod_timer.timeout.connect(self._end_interaction)
+
         # assume that we are standing upright and compute azimuth around that axis
         self.natural_view_up = (0, 0, 1)
 
@@ -266,12 +296,59 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
         elif event == "RightButtonReleaseEvent":
             self.zooming = 0
 
+        if not (self.rotating or self.panning or self.zooming):
+            self._end_interaction()
+
     def mouse_scroll_backward(self, obj, event):
+        self._start_interaction()
         self.zoomOut()
 
     def mouse_scroll_forward(self, obj, event):
+        self._start_interaction()
         self.zoomIn()
 
+    def _start_interaction(self):
+        # show the decimated paths until the view stops changing
+        self.update_level_of_detail(interactive=True)
+        self._lod_timer.start()
+
+    def _end_interaction(self):
+        self._lod_timer.stop()
+        if self.update_level_of_detail(interactive=False):
+            self.renderer_window.Render()
+
+    def world_per_pixel(self):
+        """Returns the size of a pixel at the focal point in world units."""
+        height = max(self.renderer_window.GetSize()[1], 1)
+        if self.camera.GetParallelProjection():
+            return 2.0 * self.camera.GetParallelScale() / height
+
+        view_angle = math.radians(self.camera.GetViewAngle())
+        return 2.0 * self.camera.GetDistance() * math.tan(view_angle / 2) / height
+
+    def update_level_of_detail(self, interactive=False):
+        """Select the level of detail of the paths.
+
+        While the view is being moved large paths are shown decimated, with
+        an error of at most `lod_pixel_error` pixels at the current zoom
+        level. Otherwise they are shown in full detail.
+
+        Returns:
+            bool : True if any path has levels of detail.
+        """
+        path_actors = getattr(self, 'path_actors', {})
+        if not any(actor.levels_of_detail for actor in path_actors.values()):
+            return False
+
+        max_error = None
+        if interactive:
+            max_error = self.lod_pixel_error * self.world_per_pixel()
+
+        for actor in path_actors.values():
+            actor.set_max_error(max_error)
+
+        return True
+
     # General high-level logic
     def mouse_move(self, obj, event):
         lastXYpos = self.interactor.GetLastEventPosition()
@@ -286,6 +363,9 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
         centerX = center[0] / 2.0
         centerY = center[1] / 2.0
 
+        if self.rotating or self.panning or self.zooming:
+            self.update_level_of_detail(interactive=True)
+
         if self.rotating:
             if self._datasource.isMachineLathe():
                 self.pan(self.renderer, self.camera, x, y, lastX, lastY, centerX, centerY)
@@ -405,36 +485,101 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
     def load_program(self, fname=None):
         LOG.debug("-------load_program")
 
-        # Cleanup the scene, remove any previous actors if any
-        for wcs_index, actor in self.path_actors.items():
-            LOG.debug("-------load_program wcs_index: {}".format(wcs_index))
-            axes_actor = actor.get_axes_actor()
-            program_bounds_actor = self.program_bounds_actors[wcs_index]
+        # a newer program supersedes any load still in progress
+        self.abortProgramLoad()
 
-            self.renderer.RemoveActor(axes_actor)
-            self.renderer.RemoveActor(actor)
-            self.renderer.RemoveActor(program_bounds_actor)
+        if not fname:
+            self.clear_program()
+            return
 
-        self.path_actors.clear()
-        self.offset_axes.clear()
-        self.program_bounds_actors.clear()
+        fname = self.resolve_filename(fname)
+        if fname is None:
+            return
 
-        start_time = time.time()
+        self._last_filename = fname
 
-        if fname:
-            # create the object which handles the canonical motion callbacks
-            # (straight_feed, straight_traverse, arc_feed, rigid_tap, etc.)
-            self.canon = VTKCanon(colors=self.path_colors)
-            self.load(fname)
-        else:
+        # gcode.parse is not reentrant, so wait for any aborted parse to
+        # return before starting a new one
+        if self._running_loaders:
+            LOG.debug("-------queueing program load until the running parse returns")
+            self._pending_program = fname
+            return
+
+        self._start_program_load(fname)
+
+    def _start_program_load(self, fname):
+        # create the object which handles the canonical motion callbacks
+        # (straight_feed, straight_traverse, arc_feed, rigid_tap, etc.)
+        # in the GUI thread, the loader only runs the interpreter
+        canon = VTKCanon(colors=self.path_colors)
+        unitcode, initcode = self.init_codes()
+
+        loader = ProgramLoader(self, canon, fname, unitcode, initcode)
+        loader.progress.connect(self.programLoadProgress)
+        loader.finished.connect(self._on_program_parsed)
+
+        self._loader = loader
+        self._running_loaders.add(loader)
+        self.programLoadStarted.emit(fname)
+        loader.start()
+
+    @Slot()
+    def abortProgramLoad(self):
+        """Cancel the program load in progress, if any.
+
+        The currently displayed program is left as is.
+        """
+        self._pending_program = None
+
+        if self._loader is not None:
+            LOG.debug("-------aborting program load")
+            self._loader.cancel()
+            self._loader = None
+            self.programLoadFinished.emit(False)
+
+    def terminate(self):
+        self.abortProgramLoad()
+        for loader in list(self._running_loaders):
+            loader.wait()
+
+    @Slot()
+    def _on_program_parsed(self):
+        loader = self.sender()
+
+        # wait() returns immediately, run() has already returned
+        loader.wait()
+        loader.deleteLater()
+        self._running_loaders.discard(loader)
+
+        if self._pending_program is not None and not self._running_loaders:
+            fname, self._pending_program = self._pending_program, None
+            self._start_program_load(fname)
+
+        if loader is not self._loader or loader.cancelled:
+            # superseded or aborted, discard the result
             return
 
-        LOG.debug("-------Load time %s seconds ---" % (time.time() - start_time))
+        self._loader = None
+
+        if loader.result is None:
+            self.programLoadFinished.emit(False)
+            return
 
-        self.canon.draw_lines()
+        self.report_parse_result(loader.result, loader.seq, loader.filename)
+
+        start_time = time.time()
+
+        canon = loader.canon
+        canon.draw_lines()
 
         LOG.debug("-------Draw time %s seconds ---" % (time.time() - start_time))
-        self.path_actors = self.canon.get_path_actors()
+
+        # swap in the new actors in one go, so the scene is never shown
+        # half loaded
+        self.clear_program()
+
+        self.canon = canon
+        self.path_actors = canon.get_path_actors()
 
         for wcs_index, actor in self.path_actors.items():
             LOG.debug("---------wcs_offsets: {}".format(self.wcs_offsets))
@@ -447,7 +592,7 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
             actor_transform.Translate(*current_offsets[:3])
             actor_transform.RotateZ(current_offsets[9])
 
-            actor.SetUserTransform(actor_transform)
+            actor.SetUserTransform(self.path_transform(wcs_index, current_offsets))
             #actor.SetPosition(path_position[:3])
 
             LOG.debug("---------current_position: {}".format(*current_offsets[:3]))
@@ -469,6 +614,23 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
         self.renderer.AddActor(self.axes_actor)
         self.renderer_window.Render()
 
+        self.programLoadFinished.emit(True)
+
+    def clear_program(self):
+        # Cleanup the scene, remove any previous actors if any
+        for wcs_index, actor in self.path_actors.items():
+            LOG.debug("-------clear_program wcs_index: {}".format(wcs_index))
+            axes_actor = actor.get_axes_actor()
+            program_bounds_actor = self.program_bounds_actors[wcs_index]
+
+            self.renderer.RemoveActor(axes_actor)
+            self.renderer.RemoveActor(actor)
+            self.renderer.RemoveActor(program_bounds_actor)
+
+        self.path_actors.clear()
+        self.offset_axes.clear()
+        self.program_bounds_actors.clear()
+
     def motion_type(self, value):
         LOG.debug("-----motion_type is: {}".format(value))
         if value == linuxcnc.MOTION_TYPE_TOOLCHANGE:
@@ -499,6 +661,39 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
         LOG.debug("on_offset_table_changed")
         self.wcs_offsets = table
 
+    def path_transform(self, wcs_index, wcs_offset):
+        """Returns the transform placing the path of `wcs_index`.
+
+        The path points include the G92 offset and XY rotation that were
+        active when the program was parsed, but not the G5x offset. The
+        transform moves them to `wcs_offset` and the current G92 offset, so
+        offset changes don't require the program to be parsed again.
+
+        Args:
+            wcs_index (int) : The WCS index, 0 for G54.
+            wcs_offset (tuple) : The WCS offset, with the rotation at index 9.
+        """
+        transform = vtk.vtkTransform()
+        if self.canon is None:
+            transform.Translate(*wcs_offset[:3])
+            transform.RotateZ(wcs_offset[9])
+            return transform
+
+        scale = 25.4 if self._datasource.isMachineMetric() else 1
+        pre, rotation, post = self.canon.offsets.transform(wcs_index + 1,
+                                                           wcs_offset[:3],
+                                                           wcs_offset[9],
+                                                           self.g92_offset,
+                                                           scale)
+        transform.Translate(*post)
+        transform.RotateZ(rotation)
+        return transform
+
+    def offsets_require_reload(self):
+        """Whether the loaded program depends on the work offsets, so that
+        offset changes can't be applied as a transform."""
+        return self.canon is not None and self.canon.offsets.dependent
+
     def update_g5x_offset(self, offset):
         LOG.debug("--------update_g5x_offset {}".format(offset))
 
@@ -508,6 +703,11 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
 
         self.axes_actor.SetUserTransform(transform)
 
+        if self.offsets_require_reload():
+            LOG.debug("--------program depends on the offsets, reloading")
+            self.reload_program()
+            return
+
         for wcs_index, path_actor in self.path_actors.items():
 
             old_program_bounds_actor = self.program_bounds_actors[wcs_index]
@@ -518,12 +718,8 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
             LOG.debug("--------wcs_index: {}, active_wcs_index: {}".format(wcs_index, self.active_wcs_index))
 
             if wcs_index == self.active_wcs_index:
-                path_transform = vtk.vtkTransform()
-                path_transform.Translate(*offset[:3])
-                path_transform.RotateZ(offset[9])
-
-                axes.SetUserTransform(path_transform)
-                path_actor.SetUserTransform(path_transform)
+                axes.SetUserTransform(transform)
+                path_actor.SetUserTransform(self.path_transform(wcs_index, offset))
 
             program_bounds_actor = ProgramBoundsActor(self.camera, path_actor)
             program_bounds_actor.showProgramBounds(self.show_program_bounds)
@@ -557,6 +753,11 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
         if self._datasource.isModeMdi() or self._datasource.isModeAuto():
             self.g92_offset = g92_offset
 
+            if self.offsets_require_reload():
+                LOG.debug("--------program depends on the offsets, reloading")
+                self.reload_program()
+                return
+
             path_offset = list(map(add, self.g92_offset, self.original_g92_offset))
             LOG.debug("---------path_offset: {}".format(path_offset))
 
@@ -564,19 +765,20 @@ class VTKBackPlot(QVTKRenderWindowInteractor, VCPWidget, BaseBackPlot):
 
                 old_program_bounds_actor = self.program_bounds_actors[wcs_index]
                 self.renderer.RemoveActor(old_program_bounds_actor)
-                # determine change in g92 offset since path was drawn
 
                 new_path_position = list(map(add, self.wcs_offsets[wcs_index][:9], path_offset))
                 LOG.debug("---------new_path_position: {}".format(path_offset))
 
                 axes = actor.get_axes_actor()
 
-                path_transform = vtk.vtkTransform()
-                path_transform.Translate(*new_path_position[:3])
+                axes_transform = vtk.vtkTransform()
+                axes_transform.Translate(*new_path_position[:3])
+
+                self.axes_actor.SetUserTransform(axes_transform)
+                axes.SetUserTransform(axes_transform)
 
-                self.axes_actor.SetUserTransform(path_transform)
-                axes.SetUserTransform(path_transform)
-                actor.SetUserTransform(path_transform)
+                # the change in g92 offset since the path was parsed
+                actor.SetUserTransform(self.path_transform(wcs_index, self.wcs_offsets[wcs_index]))
 
                 program_bounds_actor = ProgramBoundsActor(self.camera, actor)
                 program_bounds_actor.showProgramBounds(self.show_program_bounds)
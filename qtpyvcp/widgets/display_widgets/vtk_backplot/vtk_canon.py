@@ -1,10 +1,11 @@
-import sys
 from collections import OrderedDict
 
 import vtk
 import vtk.qt
 from linuxcnc_datasource import LinuxCncDataSource
 from path_actor import PathActor
+from path_builder import PathBuilder
+from qtpyvcp.lib.program_offsets import ProgramOffsets
 from qtpyvcp.utilities import logger
 from qtpyvcp.widgets.display_widgets.vtk_backplot.base_canon import StatCanon
 
@@ -29,6 +30,32 @@ class VTKCanon(StatCanon):
 
         self.active_wcs_index = self._datasource.getActiveWcsIndex()
 
+        # the offsets the path was parsed with, the G5x offsets are applied
+        # by the path actor transforms and are not part of the path points
+        self.offsets = ProgramOffsets()
+
+        # set by the program loader to report progress and to abort parsing
+        self.aborted = False
+        self.total_lines = 0
+        self.progress_callback = None
+        self.previous_progress = 0
+
+    def check_abort(self):
+        if self.aborted:
+            raise KeyboardInterrupt
+
+    def next_line(self, st):
+        super(VTKCanon, self).next_line(st)
+
+        if self.aborted:
+            raise KeyboardInterrupt
+
+        if self.progress_callback is not None and self.total_lines > 0:
+            progress = min(self.seq_num * 100 // self.total_lines, 100)
+            if progress != self.previous_progress:
+                self.previous_progress = progress
+                self.progress_callback(progress)
+
     def comment(self, comment):
         LOG.debug("G-code Comment: {}".format(comment))
         items = comment.lower().split(',', 1)
@@ -47,60 +74,43 @@ class VTKCanon(StatCanon):
 
     def set_g5x_offset(self, index, x, y, z, a, b, c, u, v, w):
         new_wcs = index - 1  # this index counts also G53 so we need to do -1
+        self.offsets.setG5xOffset(index, x, y, z)
         LOG.debug("---------received wcs change: {}".format(new_wcs))
-        if new_wcs not in self.path_actors.keys():
-            self.path_actors[new_wcs] = PathActor(self._datasource)
-            self.path_points[new_wcs] = list()
+        # the path actors are created in draw_lines, so that parsing does not
+        # create any VTK objects and can be run in a worker thread
+        if new_wcs not in self.path_points:
+            self.path_points[new_wcs] = PathBuilder()
 
         self.active_wcs_index = new_wcs
 
+    def set_g92_offset(self, x, y, z, a, b, c, u, v, w):
+        super(VTKCanon, self).set_g92_offset(x, y, z, a, b, c, u, v, w)
+        self.offsets.setG92Offset(x, y, z)
+
+    def set_xy_rotation(self, rotation):
+        super(VTKCanon, self).set_xy_rotation(rotation)
+        self.offsets.setRotation(rotation)
+
     def add_path_point(self, line_type, start_point, end_point):
-        line = [start_point[:3], end_point[:3]]
-        self.path_points.get(self.active_wcs_index).append((line_type, line))
+        self.path_points.get(self.active_wcs_index).add(line_type, start_point, end_point, self.seq_num)
 
     def draw_lines(self):
-        LOG.debug("---------path points size: {}".format(sys.getsizeof(self.path_points)))
         LOG.debug("---------path points length: {}".format(len(self.path_points)))
 
         # TODO: for some reason, we need to multiply for metric, find out why!
         multiplication_factor = 25.4 if self._datasource.isMachineMetric() else 1
 
-        for wcs_index, data in self.path_points.items():
-            index = 0
-
+        for wcs_index, builder in self.path_points.items():
             path_actor = self.path_actors.get(wcs_index)
-            if path_actor is not None:
-                for line_type, line_data in data:
-                    start_point = line_data[0]
-                    end_point = line_data[1]
-
-                    path_actor.points.InsertNextPoint(start_point[0] * multiplication_factor,
-                                                      start_point[1] * multiplication_factor,
-                                                      start_point[2] * multiplication_factor)
-
-                    path_actor.points.InsertNextPoint(end_point[0] * multiplication_factor,
-                                                      end_point[1] * multiplication_factor,
-                                                      end_point[2] * multiplication_factor)
-
-                    path_actor.colors.InsertNextTypedTuple(self.path_colors.get(line_type).getRgb()[:4])
-
-                    line = vtk.vtkLine()
-                    line.GetPointIds().SetId(0, index)
-                    line.GetPointIds().SetId(1, index + 1)
-
-                    path_actor.lines.InsertNextCell(line)
-
-                    index += 2
+            if path_actor is None:
+                path_actor = PathActor(self._datasource)
+                self.path_actors[wcs_index] = path_actor
 
-                # free up memory, lots of it for big files
-                self.path_points[wcs_index] = list()
+            LOG.debug("---------wcs {} segments: {}".format(wcs_index, len(builder)))
+            builder.build(path_actor, self.path_colors, multiplication_factor)
 
-                path_actor.poly_data.SetPoints(path_actor.points)
-                path_actor.poly_data.SetLines(path_actor.lines)
-                path_actor.poly_data.GetCellData().SetScalars(path_actor.colors)
-                path_actor.data_mapper.SetInputData(path_actor.poly_data)
-                path_actor.data_mapper.Update()
-                path_actor.SetMapper(path_actor.data_mapper)
+            # free up memory, lots of it for big files
+            builder.clear()
 
     def get_path_actors(self):
         return self.path_actors
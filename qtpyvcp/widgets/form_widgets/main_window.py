@@ -1,7 +1,6 @@
 import os
 import sys
 
-from qtpy import uic
 from qtpy.QtGui import QKeySequence
 from qtpy.QtCore import Qt, Slot, QTimer
 from qtpy.QtWidgets import QMainWindow, QApplication, QAction, QMessageBox, \
@@ -9,10 +8,11 @@ from qtpy.QtWidgets import QMainWindow, QApplication, QAction, QMessageBox, \
 
 import qtpyvcp
 from qtpyvcp import actions
-from qtpyvcp.utilities import logger
+from qtpyvcp.utilities import logger, profiler
 from qtpyvcp.utilities.info import Info
 from qtpyvcp.plugins import getPlugin
 from qtpyvcp.utilities.settings import getSetting
+from qtpyvcp.utilities.ui_cache import loadUi
 from qtpyvcp.widgets.dialogs import showDialog as _showDialog
 from qtpyvcp.app.launcher import _initialize_object_from_dict
 
@@ -95,11 +95,15 @@ class VCPMainWindow(QMainWindow):
     def loadUi(self, ui_file):
         """Loads a window layout from a QtDesigner .ui file.
 
+        The compiled form of the .ui file is used if it is in the UI cache,
+        see :mod:`qtpyvcp.utilities.ui_cache`.
+
         Args:
             ui_file (str) : Path to a .ui file to load.
         """
-        # TODO: Check for compiled *_ui.py files and load from that if exists
-        uic.loadUi(ui_file, self)
+        with profiler.span(os.path.basename(ui_file), 'window.loadUi',
+                           path=ui_file):
+            loadUi(ui_file, self)
 
     def loadStylesheet(self, stylesheet):
         """Loads a QSS stylesheet containing styles to be applied
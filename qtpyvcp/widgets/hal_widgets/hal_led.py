@@ -34,14 +34,14 @@ class HalLedIndicator(LEDWidget, HALWidget):
         obj_name = self.getPinBaseName()
 
         # add led.on HAL pin
-        self._on_pin = comp.addPin(obj_name + ".on", "bit", "in")
+        self._on_pin = comp.addPin(obj_name + ".on", "bit", "in", priority="slow")
         # self._on_pin.value = self.isO()
         self._on_pin.valueChanged.connect(lambda state: self.setState(state))
 
         # add led.flash HAL pin
-        self._flash_pin = comp.addPin(obj_name + ".flash", "bit", "in")
+        self._flash_pin = comp.addPin(obj_name + ".flash", "bit", "in", priority="slow")
         self._flash_pin.valueChanged.connect(lambda flash: self.setFlashing(flash))
 
         # add led.flash-rate HAL pin
-        self._flash_rate_pin = comp.addPin(obj_name + ".flash-rate", "u32", "in")
+        self._flash_rate_pin = comp.addPin(obj_name + ".flash-rate", "u32", "in", priority="slow")
         self._flash_rate_pin.valueChanged.connect(lambda rate: self.setFlashRate(rate))
@@ -24,6 +24,7 @@
 # http://pyqt.sourceforge.net/Docs/QScintilla2/index.html
 # https://qscintilla.com/
 
+import re
 import sys
 import os
 
@@ -47,6 +48,29 @@ except ImportError as e:
 STATUS = getPlugin('status')
 INFO = Info()
 
+# lines styled past the last visible line
+STYLE_LOOKAHEAD_LINES = 200
+# the minimum number of bytes styled per call
+STYLE_CHUNK_SIZE = 64 * 1024
+
+# a comment extends to the closing paren or the end of the line, a stray
+# closing paren is styled as a comment too
+_TOKEN_RE = re.compile(br'(?P<comment>\([^)]*\)?|\))'
+                       br'|(?P<assignment>[%<>#=]+)'
+                       br'|(?P<value>[\[\]]+)'
+                       br'|(?P<key>[A-Za-z]+)'
+                       br'|(?P<default>[^%<>#=\[\]A-Za-z()]+)')
+
+_TOKEN_STYLES = {
+    'assignment': 3,
+    'value': 4,
+    'key': 2,
+    'default': 0,
+}
+
+_MSG_RE = re.compile(br'msg|debug', re.IGNORECASE)
+_MSG_KEYWORD_RE = re.compile(br'(?P<keyword>[msgdebu,]+)|(?P<other>[^msgdebu,]+)', re.IGNORECASE)
+
 
 # ==============================================================================
 # Simple custom lexer for Gcode
@@ -105,73 +129,71 @@ class GcodeLexer(QsciLexerCustom):
         if editor is None:
             return
 
+        # only style what is on screen plus some look-ahead, scintilla keeps
+        # track of how far the document has been styled and asks for more
+        # when it is scrolled into view, so the cost per call does not depend
+        # on the size of the file
+        end = min(end, editor.length(), max(self._styleLimit(editor), start + STYLE_CHUNK_SIZE))
+        if end <= start:
+            return
+
         # scintilla works with encoded bytes, not decoded characters.
         # this matters if the source contains non-ascii characters and
         # a multi-byte encoding is used (e.g. utf-8)
-        source = ''
-        if end > editor.length():
-            end = editor.length()
-        if end > start:
-            if sys.hexversion >= 0x02060000:
-                # faster when styling big files, but needs python 2.6
-                source = bytearray(end - start)
-                editor.SendScintilla(
-                    editor.SCI_GETTEXTRANGE, start, end, source)
-            else:
-                source = unicode(editor.text()).encode('utf-8')[start:end]
-        if not source:
-            return
-
-        # the line index will also be needed to implement folding
-        index = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, start)
-        if index > 0:
-            # the previous state may be needed for multi-line styling
-            pos = editor.SendScintilla(
-                editor.SCI_GETLINEENDPOSITION, index - 1)
-            state = editor.SendScintilla(editor.SCI_GETSTYLEAT, pos)
-        else:
-            state = self.Default
+        source = bytearray(end - start)
+        editor.SendScintilla(editor.SCI_GETTEXTRANGE, start, end, source)
+        source = bytes(source)
 
         set_style = self.setStyling
         self.startStyling(start, 0x1f)
 
-        # scintilla always asks to style whole lines
+        # scintilla always asks to style whole lines, and since comments
+        # can't span lines every line starts in the default state
         for line in source.splitlines(True):
-            # print line
-            length = len(line)
-            graymode = False
-            msg = ('msg' in line.lower() or 'debug' in line.lower())
-            for char in str(line):
-                # print char
-                if char == '(':
-                    graymode = True
-                    set_style(1, self.Comment)
-                    continue
-                elif char == ')':
-                    graymode = False
-                    set_style(1, self.Comment)
-                    continue
-                elif graymode:
-                    if msg and char.lower() in ('m', 's', 'g', ',', 'd', 'e', 'b', 'u'):
-                        set_style(1, self.Assignment)
-                        if char == ',': msg = False
-                    else:
-                        set_style(1, self.Comment)
-                    continue
-                elif char in ('%', '<', '>', '#', '='):
-                    state = self.Assignment
-                elif char in ('[', ']'):
-                    state = self.Value
-                elif char.isalpha():
-                    state = self.Key
-                elif char.isdigit():
-                    state = self.Default
+            msg = _MSG_RE.search(line) is not None
+
+            for match in _TOKEN_RE.finditer(line):
+                kind = match.lastgroup
+                length = match.end() - match.start()
+
+                if kind != 'comment':
+                    set_style(length, _TOKEN_STYLES[kind])
+                elif not msg:
+                    set_style(length, self.Comment)
                 else:
-                    state = self.Default
-                set_style(1, state)
+                    msg = self._styleMsgComment(match.group(), set_style)
+
+    def _styleLimit(self, editor):
+        """Returns the position up to which the text should be styled."""
+        first = editor.SendScintilla(editor.SCI_GETFIRSTVISIBLELINE)
+        count = editor.SendScintilla(editor.SCI_LINESONSCREEN)
+        last = editor.SendScintilla(editor.SCI_DOCLINEFROMVISIBLE, first + count)
+        pos = editor.SendScintilla(editor.SCI_POSITIONFROMLINE, last + STYLE_LOOKAHEAD_LINES + 1)
+        if pos < 0:
+            # past the last line
+            return editor.length()
+        return pos
+
+    def _styleMsgComment(self, comment, set_style):
+        # the (MSG, ...) and (DEBUG, ...) keywords are highlighted up to and
+        # including the first comma, returns whether that comma is still to come
+        set_style(1, self.Comment)
+
+        msg = True
+        for match in _MSG_KEYWORD_RE.finditer(comment, 1):
+            text = match.group()
+            if not msg or match.lastgroup == 'other':
+                set_style(len(text), self.Comment)
+            elif b',' in text:
+                head = text.index(b',') + 1
+                set_style(head, self.Assignment)
+                if head < len(text):
+                    set_style(len(text) - head, self.Comment)
+                msg = False
+            else:
+                set_style(len(text), self.Assignment)
 
-            # folding implementation goes here
-            index += 1
+        return msg
 
 
 # ==============================================================================
@@ -3,66 +3,130 @@ GcodeTextEdit
 -------------
 
 QPlainTextEdit based G-code editor with syntax highlighting.
+
+Program files larger than the ``largeFileThreshold`` property are memory
+mapped and shown read only, with only a window of lines around the current
+position loaded into the document (and highlighted). The window follows the
+scroll position and ``STATUS.motion_line``.
 """
 
 import os
+import re
 import oyaml as yaml
 
-from qtpy.QtCore import (Qt, QRect, QRegularExpression, QEvent, Slot, Signal, Property)
+from qtpy.QtCore import (Qt, QRect, QEvent, QTimer, Slot, Signal, Property)
 from qtpy.QtGui import (QFont, QColor, QPainter, QSyntaxHighlighter, QTextDocument,
-                        QTextOption, QTextFormat, QTextCharFormat, QTextCursor)
+                        QTextOption, QTextFormat, QTextCharFormat, QTextCursor,
+                        QTextBlockUserData)
 from qtpy.QtWidgets import (QApplication, QPlainTextEdit, QTextEdit, QWidget, QMenu, QPlainTextDocumentLayout)
 
 from qtpyvcp import DEFAULT_CONFIG_FILE
 from qtpyvcp.plugins import getPlugin
 from qtpyvcp.actions import program_actions
+from qtpyvcp.lib.mapped_text_file import MappedTextFile
 
 STATUS = getPlugin('status')
 YAML_DIR = os.path.dirname(DEFAULT_CONFIG_FILE)
 
+# number of lines loaded into the document in large file mode
+LARGE_FILE_WINDOW = 2000
+# reload the window when the view gets this close to its edges
+LARGE_FILE_MARGIN = 200
 
-class GcodeSyntaxHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent):
-        super(GcodeSyntaxHighlighter, self).__init__(parent.document())
+# compiled syntax definitions, see compileSyntax()
+_SYNTAX_CACHE = {}
 
-        self._parent = parent
 
-        self.rules = []
-        self.char_fmt = QTextCharFormat()
+def compileSyntax(filename):
+    """Compile a YAML syntax definition into a single regex.
 
-        self._abort = False
+    The patterns of each context are merged into one named group, and the
+    groups into one alternation, so a block is highlighted in a single pass.
+    Later contexts and patterns take priority over earlier ones, like when
+    each pattern was applied on its own in turn. The result is cached until
+    the file changes, so it is shared by all the highlighters.
 
-        self.loadSyntaxFromYAML()
+    Args:
+        filename (str) : The YAML syntax definition file.
 
-    def loadSyntaxFromYAML(self):
+    Returns:
+        tuple : ``(regex, fmt_specs)``, where `fmt_specs` maps the group
+            names of the regex to the ``textFormat`` spec of the context.
+    """
+    key = (filename, os.path.getmtime(filename))
+    if key in _SYNTAX_CACHE:
+        return _SYNTAX_CACHE[key]
+
+    with open(filename) as fh:
+        syntax_specs = yaml.load(fh, Loader=yaml.FullLoader)
+
+    assert isinstance(syntax_specs, dict), \
+        "Invalid YAML format for language spec, root item must be a dictionary."
 
-        with open(os.path.join(YAML_DIR, 'gcode_syntax.yml')) as fh:
-            syntax_specs = yaml.load(fh, Loader=yaml.FullLoader)
+    groups = []
+    fmt_specs = {}
 
-        assert isinstance(syntax_specs, dict), \
-            "Invalid YAML format for language spec, root item must be a dictionary."
+    for lang_name, language in syntax_specs.items():
 
-        cio = QRegularExpression.CaseInsensitiveOption
+        definitions = language.get('definitions', {})
+
+        for context_name, spec in definitions.items():
+
+            # a string is a sequence of single character patterns
+            patterns = list(spec.get('match', []))
+            if not patterns:
+                continue
 
-        for lang_name, language in syntax_specs.items():
+            name = 'c{}'.format(len(groups))
+            pattern = '|'.join('(?:{})'.format(p) for p in reversed(patterns))
+            groups.append('(?P<{}>{})'.format(name, pattern))
+            fmt_specs[name] = spec.get('textFormat', {})
 
-            definitions = language.get('definitions', {})
+    regex = re.compile('|'.join(reversed(groups)), re.IGNORECASE)
 
-            default_fmt_spec = definitions.get('default', {}).get('textFormat', {})
+    for old_key in [k for k in _SYNTAX_CACHE if k[0] == filename]:
+        del _SYNTAX_CACHE[old_key]
+    _SYNTAX_CACHE[key] = regex, fmt_specs
 
-            for context_name, spec in definitions.items():
+    return regex, fmt_specs
 
-                base_fmt = default_fmt_spec.copy()
-                fmt_spec = spec.get('textFormat', {})
 
-                # update the default fmt spec
-                base_fmt.update(fmt_spec)
+class GcodeBlockData(QTextBlockUserData):
+    """The matches found in a block, reused while its text is unchanged."""
+    def __init__(self, regex, text_hash, spans):
+        super(GcodeBlockData, self).__init__()
+        self.regex = regex
+        self.text_hash = text_hash
+        self.spans = spans
 
-                char_fmt = self.charFormatFromSpec(fmt_spec)
 
-                patterns = spec.get('match', [])
-                for pattern in patterns:
-                    self.rules.append([QRegularExpression(pattern, cio), char_fmt])
+class GcodeSyntaxHighlighter(QSyntaxHighlighter):
+    def __init__(self, parent):
+        super(GcodeSyntaxHighlighter, self).__init__(parent.document())
+
+        self._parent = parent
+
+        self.regex = None
+        self.formats = {}
+        self.char_fmt = QTextCharFormat()
+
+        self._abort = False
+        self.highlighting = False
+
+        self.loadSyntaxFromYAML()
+
+    def loadSyntaxFromYAML(self):
+        self.regex, fmt_specs = compileSyntax(os.path.join(YAML_DIR, 'gcode_syntax.yml'))
+
+        self.formats = {}
+        for name, fmt_spec in fmt_specs.items():
+            self.formats[name] = self.charFormatFromSpec(fmt_spec)
+
+    def updateFormats(self):
+        """Rebuild the char formats, e.g. after a font change, and reapply
+        them. Blocks that have not changed are not matched again."""
+        self.loadSyntaxFromYAML()
+        self.rehighlight()
 
     def charFormatFromSpec(self, fmt_spec):
 
@@ -92,24 +156,25 @@ class GcodeSyntaxHighlighter(QSyntaxHighlighter):
         """Apply syntax highlighting to the given block of text.
         """
 
-        QApplication.processEvents()
-
-        for regex, fmt in self.rules:
-
-            nth = 0
-            match = regex.match(text, offset=0)
-            index = match.capturedStart()
+        self.highlighting = True
+        try:
+            QApplication.processEvents()
+        finally:
+            self.highlighting = False
 
-            while index >= 0:
+        text_hash = hash(text)
 
-                # We actually want the index of the nth match
-                index = match.capturedStart(nth)
-                length = match.capturedLength(nth)
-                self.setFormat(index, length, fmt)
+        data = self.currentBlockUserData()
+        if not isinstance(data, GcodeBlockData) or data.regex is not self.regex \
+                or data.text_hash != text_hash:
+            spans = [(match.start(), match.end() - match.start(), match.lastgroup)
+                     for match in self.regex.finditer(text)]
+            data = GcodeBlockData(self.regex, text_hash, spans)
+            self.setCurrentBlockUserData(data)
 
-                # check the rest of the string
-                match = regex.match(text, offset=index + length)
-                index = match.capturedStart()
+        formats = self.formats
+        for start, length, name in data.spans:
+            self.setFormat(start, length, formats[name])
 
 
 class GcodeTextEdit(QPlainTextEdit):
@@ -131,6 +196,17 @@ class GcodeTextEdit(QPlainTextEdit):
         self.current_line_background = QColor(self.palette().alternateBase())
 
         self.old_docs = []
+
+        # large file mode
+        self.large_file_threshold = 20
+        self.mapped_file = None
+        self.line_offset = 0
+        self._read_only = self.isReadOnly()
+        self._pending_window = None
+        # line to move the cursor to once the pending window is shown
+        self._pending_current_line = None
+        self._showing_lines = False
+
         # set the custom margin
         self.margin = NumberMargin(self)
 
@@ -152,6 +228,7 @@ class GcodeTextEdit(QPlainTextEdit):
 
         # connect signals
         self.cursorPositionChanged.connect(self.onCursorChanged)
+        self.verticalScrollBar().valueChanged.connect(self.onScrollChanged)
 
         # connect status signals
         STATUS.file.notify(self.loadProgramFile)
@@ -173,10 +250,15 @@ class GcodeTextEdit(QPlainTextEdit):
     def changeEvent(self, event):
         if event.type() == QEvent.FontChange:
             # Update syntax highlighter with new font
-            self.gCodeHighlighter = GcodeSyntaxHighlighter(self)
+            if hasattr(self, 'gCodeHighlighter'):
+                self.gCodeHighlighter.updateFormats()
         super(GcodeTextEdit, self).changeEvent(event)
 
     def setPlainText(self, p_str):
+        self.closeLargeFile()
+        self._setDocumentText(p_str)
+
+    def _setDocumentText(self, p_str):
         # FixMe: Keep a reference to old QTextDocuments form previously loaded
         # files. This is needed to prevent garbage collection which results in a
         # seg fault if the document is discarded while still being highlighted.
@@ -195,10 +277,19 @@ class GcodeTextEdit(QPlainTextEdit):
     @Slot(bool)
     def EditorReadOnly(self, state):
         """Set to Read Only to disable editing"""
-        if state:
-            self.setReadOnly(True)
-        else:
-            self.setReadOnly(False)
+        self._read_only = bool(state)
+        if self.mapped_file is None:
+            self.setReadOnly(self._read_only)
+
+    @Property(int)
+    def largeFileThreshold(self):
+        """Size in MB above which program files are memory mapped and shown
+        read only, 0 disables large file mode."""
+        return self.large_file_threshold
+
+    @largeFileThreshold.setter
+    def largeFileThreshold(self, size):
+        self.large_file_threshold = size
 
     @Property(QColor)
     def currentLineBackground(self):
@@ -251,19 +342,134 @@ class GcodeTextEdit(QPlainTextEdit):
     @Slot(object)
     def loadProgramFile(self, fname=None):
         if fname:
+            threshold = self.large_file_threshold * 1024 * 1024
+            if threshold > 0 and os.path.getsize(fname) > threshold:
+                self.loadLargeFile(fname)
+                return
+
             with open(fname) as f:
                 gcode = f.read()
             self.setPlainText(gcode)
 
+    def loadLargeFile(self, fname):
+        """Show `fname` in large file mode.
+
+        The file is memory mapped and only a window of ``LARGE_FILE_WINDOW``
+        lines is loaded into the document at a time. The editor is read only
+        while in large file mode.
+        """
+        self.closeLargeFile()
+
+        self.mapped_file = MappedTextFile(fname)
+        self.setReadOnly(True)
+
+        self.line_offset = 0
+        self._setDocumentText(self.mapped_file.lines(0, LARGE_FILE_WINDOW))
+
+    def closeLargeFile(self):
+        if self.mapped_file is None:
+            return
+
+        self.mapped_file.close()
+        self.mapped_file = None
+        self.line_offset = 0
+        self._pending_window = None
+        self._pending_current_line = None
+        self.setReadOnly(self._read_only)
+
+    def lineCount(self):
+        """Returns the number of lines in the program."""
+        if self.mapped_file is not None:
+            return max(self.mapped_file.line_count, 1)
+        return self.blockCount()
+
+    def showLines(self, first_line):
+        """Load the window of lines starting at `first_line` (0 based) in
+        large file mode, keeping the cursor and the scroll position on the
+        same program lines where possible."""
+        if self.mapped_file is None:
+            return
+
+        total = self.mapped_file.line_count
+        first_line = max(0, min(first_line, total - LARGE_FILE_WINDOW))
+        if first_line == self.line_offset:
+            return
+
+        if self.gCodeHighlighter.highlighting:
+            # don't swap the text from under the highlighter, try again
+            # once it has finished
+            if self._pending_window is None:
+                QTimer.singleShot(0, self._showPendingLines)
+            self._pending_window = first_line
+            return
+
+        top_line = self.line_offset + self.verticalScrollBar().value()
+        cursor_line = self.line_offset + self.textCursor().blockNumber()
+
+        self.line_offset = first_line
+        self.block_number = None
+
+        # don't reload the window for scroll changes made here
+        self._showing_lines = True
+        try:
+            self.document().setPlainText(self.mapped_file.lines(first_line, LARGE_FILE_WINDOW))
+
+            block = self.document().findBlockByNumber(cursor_line - first_line)
+            if not block.isValid():
+                block = self.document().findBlockByNumber(top_line - first_line)
+            if block.isValid():
+                self.setTextCursor(QTextCursor(block))
+
+            self.verticalScrollBar().setValue(top_line - first_line)
+        finally:
+            self._showing_lines = False
+
+        self.margin.update()
+
+    def _showPendingLines(self):
+        first_line, self._pending_window = self._pending_window, None
+        if first_line is not None:
+            self.showLines(first_line)
+
+        line, self._pending_current_line = self._pending_current_line, None
+        if line is not None:
+            self.setCurrentLine(line)
+
+    def onScrollChanged(self, value):
+        if self.mapped_file is None or self._showing_lines:
+            return
+
+        end = self.line_offset + self.blockCount()
+        if (value < LARGE_FILE_MARGIN and self.line_offset > 0) or \
+                (value > self.verticalScrollBar().maximum() - LARGE_FILE_MARGIN
+                 and end < self.mapped_file.line_count):
+            self.showLines(self.line_offset + value - LARGE_FILE_WINDOW // 2)
+
     @Slot(int)
     @Slot(object)
     def setCurrentLine(self, line):
-        cursor = QTextCursor(self.document().findBlockByLineNumber(line - 1))
+        self._pending_current_line = None
+
+        if self.mapped_file is not None:
+            index = line - 1 - self.line_offset
+            if not LARGE_FILE_MARGIN <= index < LARGE_FILE_WINDOW - LARGE_FILE_MARGIN:
+                self.showLines(line - 1 - LARGE_FILE_WINDOW // 2)
+
+                if self._pending_window is not None:
+                    # the window is shown later, move the cursor then
+                    self._pending_current_line = line
+                    return
+
+        block = self.document().findBlockByLineNumber(line - 1 - self.line_offset)
+        if not block.isValid():
+            return
+
+        cursor = QTextCursor(block)
         self.setTextCursor(cursor)
         self.centerCursor()
 
     def getCurrentLine(self):
-        return self.textCursor().blockNumber() + 1
+        return self.textCursor().blockNumber() + 1 + self.line_offset
 
     def onCursorChanged(self):
         # highlights current line, find a way not to use QTextEdit
@@ -278,7 +484,7 @@ class GcodeTextEdit(QPlainTextEdit):
             self.setExtraSelections([selection])
 
         # emit signals for backplot etc.
-        self.focused_line = block_number + 1
+        self.focused_line = block_number + 1 + self.line_offset
         self.focusLine.emit(self.focused_line)
 
     def contextMenuEvent(self, event):
@@ -312,7 +518,7 @@ class NumberMargin(QWidget):
         self.highlight_color = QColor('#000000')
 
     def getWidth(self):
-        blocks = self.parent.blockCount()
+        blocks = self.parent.lineCount()
         return self.parent.fontMetrics().width(str(blocks)) + 5
 
     def updateWidth(self): # check the number column width and adjust
@@ -358,7 +564,7 @@ class NumberMargin(QWidget):
 
             text_rec = QRect(0, block_top, self.width(), self.parent.fontMetrics().height())
             painter.fillRect(text_rec, background)
-            painter.drawText(text_rec, Qt.AlignRight, str(block_num + 1))
+            painter.drawText(text_rec, Qt.AlignRight, str(block_num + 1 + self.parent.line_offset))
             block = block.next()
 
         painter.end()
@@ -105,10 +105,26 @@ class ToolModel(QStandardItemModel):
         self.beginResetModel()
         self.endResetModel()
 
-    def updateModel(self, tool_table):
-        # update model with new data
+    def updateModel(self, changes):
+        # update model with the tools that changed, removed tools are None
+        tnums = sorted(self._tool_table)
+        if all(tool is not None and tnum in self._tool_table
+               for tnum, tool in changes.items()):
+            # only existing tools changed, the rows stay the same
+            for tnum, tool in changes.items():
+                self._tool_table[tnum] = tool.copy()
+                row = tnums.index(tnum) - 1
+                if row >= 0:
+                    self.dataChanged.emit(self.index(row, 0),
+                                          self.index(row, self.columnCount() - 1))
+            return
+
         self.beginResetModel()
-        self._tool_table = tool_table
+        for tnum, tool in changes.items():
+            if tool is None:
+                self._tool_table.pop(tnum, None)
+            else:
+                self._tool_table[tnum] = tool.copy()
         self.endResetModel()
 
     def setColumns(self, columns):
@@ -208,9 +224,13 @@ class ToolModel(QStandardItemModel):
         return True
 
     def loadToolTable(self):
-        # the tooltable plugin will emit the tool_table_changed signal
-        # so we don't need to do any more here
+        # the tooltable plugin will emit the tool_table_changed signal for
+        # any tools that changed in the file, then discard unsaved changes
         self.tt.loadToolTable()
+
+        self.beginResetModel()
+        self._tool_table = self.tt.getToolTable()
+        self.endResetModel()
         return True
 
 
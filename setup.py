@@ -90,6 +90,7 @@ setup(
         'HiYaPyCo',
         'pyopengl',
         'vtk',
+        'numpy',
         'pyqtgraph',
         'oyaml',
         'simpleeval',